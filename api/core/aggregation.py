@@ -0,0 +1,103 @@
+"""
+BESS Aggregation
+================
+Time-bucketed aggregates of metric files for charts and reports: any bucket width
+(5min, 1h, 1d, ...) and any mix of min, max, mean, sum, last, count and percentiles
+(p50, p95, ...). Buckets start on multiples of the width since the epoch, like the
+rollup pyramid, so every metric shares one bucket grid. Aggregates the pyramid
+already holds are regrouped from it; percentiles and unaligned ranges are computed
+from the raw rows with one vectorized group-by per metric.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from core.columnar_cache import read_metric_file
+from core.rollups import rollup_buckets, group_raw
+
+BASIC_AGGREGATIONS = ("min", "max", "mean", "sum", "last", "count")
+# Aggregations derivable from min/max/mean/last/count rollup buckets
+ROLLUP_AGGREGATIONS = set(BASIC_AGGREGATIONS)
+
+_WIDTH_PATTERN = re.compile(r"^(\d+)(s|min|h|d)$")
+_WIDTH_UNITS = {"s": 1, "min": 60, "h": 3600, "d": 86400}
+_PERCENTILE_PATTERN = re.compile(r"^p(\d{1,2}(\.\d+)?|100)$")
+
+
+def parse_bucket_width(width: str) -> int:
+    """Bucket width such as "5min", "1h" or "1d" in seconds"""
+    match = _WIDTH_PATTERN.match(width or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid bucket width: {width}. Use a number followed by s, min, h or d")
+    return int(match.group(1)) * _WIDTH_UNITS[match.group(2)]
+
+
+def parse_aggregations(functions: str) -> List[str]:
+    """Comma-separated aggregation names; percentiles are written p0-p100 (e.g. p95, p99.9)"""
+    parsed = [name.strip().lower() for name in (functions or "").split(',') if name.strip()]
+    invalid = [name for name in parsed if name not in BASIC_AGGREGATIONS and not _PERCENTILE_PATTERN.match(name)]
+    if invalid or not parsed:
+        raise ValueError(f"Invalid aggregations: {', '.join(invalid) or functions}. "
+                         f"Use {', '.join(BASIC_AGGREGATIONS)} or percentiles like p95")
+    return list(dict.fromkeys(parsed))
+
+
+def aggregate_raw(df: pd.DataFrame, width_s: int, functions: List[str]) -> pd.DataFrame:
+    """Bucket raw ts/value rows into one column per aggregation; NaN values count as missing"""
+    if df.empty:
+        return pd.DataFrame({name: pd.Series(dtype=np.float64) for name in functions},
+                            index=pd.Index([], dtype=np.int64, name='bucket'))
+    grouped = group_raw(df, width_s)
+
+    basic = [name for name in functions if name in BASIC_AGGREGATIONS]
+    result = grouped.agg(sorted(set(basic) | {'count'}))
+    if 'sum' in result:
+        # Buckets without values have no sum rather than 0
+        result['sum'] = result['sum'].where(result['count'] > 0)
+
+    # p50 and p50.0 name the same quantile, which is computed once
+    percentiles = {name: float(name[1:]) / 100 for name in functions if name not in BASIC_AGGREGATIONS}
+    if percentiles:
+        quantiles = grouped.quantile(sorted(set(percentiles.values()))).unstack()
+        for name, q in percentiles.items():
+            result[name] = quantiles[q]
+    return result[functions]
+
+
+def _from_rollups(buckets: pd.DataFrame, functions: List[str]) -> pd.DataFrame:
+    result = buckets.set_index('bucket')
+    result = result.assign(sum=(result['mean'] * result['count']).where(result['count'] > 0))
+    return result[functions]
+
+
+def aggregate_metric(file_path: Path, width_s: int, functions: List[str], start: datetime = None,
+                     end: datetime = None) -> Tuple[str, pd.DataFrame]:
+    """
+    (source, frame indexed by bucket start in epoch ns with one column per aggregation)
+    for one metric file over [start, end); source is "rollup" or "raw".
+    """
+    if set(functions) <= ROLLUP_AGGREGATIONS:
+        buckets = rollup_buckets(file_path, width_s, start, end)
+        if buckets is not None:
+            return "rollup", _from_rollups(buckets, functions)
+
+    if start is not None and end is not None:
+        df = read_metric_file(file_path, start=start, end=end)
+        df = df[(df['ts'] >= start) & (df['ts'] < end)]
+    else:
+        df = read_metric_file(file_path)
+        if start is not None:
+            df = df[df['ts'] >= start]
+        if end is not None:
+            df = df[df['ts'] < end]
+    return "raw", aggregate_raw(df, width_s, functions)
+
+
+def bucket_grid(frames: Dict[str, pd.DataFrame]) -> np.ndarray:
+    """Sorted union of the bucket starts of several aggregated metrics"""
+    indexes = [frame.index.to_numpy(dtype=np.int64) for frame in frames.values()]
+    return np.unique(np.concatenate(indexes)) if indexes else np.array([], dtype=np.int64)
@@ -0,0 +1,93 @@
+"""
+BESS Time Alignment
+===================
+Vectorized as-of (nearest-neighbour) alignment of metric series onto a base timeline.
+Replaces the per-timestamp idxmin search with a single sorted searchsorted pass.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+ALIGNMENT_DIRECTIONS = ("nearest", "backward", "forward")
+
+
+def to_epoch_ns(timestamps) -> np.ndarray:
+    """Convert a datetime Series/Index/array to an int64 array of epoch nanoseconds"""
+    values = np.asarray(timestamps)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').view('int64')
+    return pd.to_datetime(values).values.astype('datetime64[ns]').view('int64')
+
+
+def asof_indexer(base_ns: np.ndarray, source_ns: np.ndarray, tolerance_ns: int,
+                 direction: str = "nearest") -> np.ndarray:
+    """
+    For every base timestamp, find the index of the matching source timestamp.
+
+    Both arrays must be sorted ascending. Returns an int64 array of source
+    positions, with -1 where no source point lies within the tolerance.
+    """
+    if direction not in ALIGNMENT_DIRECTIONS:
+        raise ValueError(f"Invalid alignment direction: {direction}. Use one of {ALIGNMENT_DIRECTIONS}")
+
+    n_source = len(source_ns)
+    if n_source == 0 or len(base_ns) == 0:
+        return np.full(len(base_ns), -1, dtype=np.int64)
+
+    # Position of the first source timestamp >= each base timestamp
+    right = np.searchsorted(source_ns, base_ns, side='left')
+    left = right - 1
+
+    right_valid = right < n_source
+    left_valid = left >= 0
+    right_clipped = np.minimum(right, n_source - 1)
+    left_clipped = np.maximum(left, 0)
+
+    # Distances to the neighbours on each side (int64 max where missing)
+    no_match = np.iinfo(np.int64).max
+    right_diff = np.where(right_valid, source_ns[right_clipped] - base_ns, no_match)
+    left_diff = np.where(left_valid, base_ns - source_ns[left_clipped], no_match)
+
+    # An exact hit sits at `right`; backward must accept it as well
+    exact = right_valid & (right_diff == 0)
+
+    if direction == "backward":
+        indexer = np.where(exact, right_clipped, left_clipped)
+        diff = np.where(exact, 0, left_diff)
+    elif direction == "forward":
+        indexer = right_clipped
+        diff = right_diff
+    else:
+        # Ties go to the earlier sample, as idxmin did
+        use_left = left_diff <= right_diff
+        indexer = np.where(use_left, left_clipped, right_clipped)
+        diff = np.where(use_left, left_diff, right_diff)
+
+    return np.where(diff <= tolerance_ns, indexer, -1).astype(np.int64)
+
+
+def align_metric(base_ns: np.ndarray, source_ns: np.ndarray, source_values: np.ndarray,
+                 tolerance: pd.Timedelta, direction: str = "nearest") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Align one metric series onto the base timeline.
+
+    Returns (values, offsets): the aligned values with NaN where no sample matched
+    or the matched sample was invalid, and the absolute time offset in seconds of
+    every match (NaN where unmatched).
+    """
+    tolerance_ns = int(pd.Timedelta(tolerance).value)
+    indexer = asof_indexer(base_ns, source_ns, tolerance_ns, direction)
+    matched = indexer >= 0
+
+    values = pd.to_numeric(pd.Series(source_values), errors='coerce').to_numpy()
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+
+    aligned = np.full(len(base_ns), np.nan, dtype=values.dtype)
+    aligned[matched] = values[indexer[matched]]
+
+    offsets = np.full(len(base_ns), np.nan)
+    offsets[matched] = np.abs(source_ns[indexer[matched]] - base_ns[matched]) / 1e9
+
+    return aligned, offsets
@@ -0,0 +1,190 @@
+"""
+BESS Device Catalog
+===================
+Persisted per-device metadata about every metric file: first/last timestamp, row
+count, median sampling interval, null ratio and the days that hold data. Entries
+are recomputed only for files whose modification time or size changed, so overlap
+selection and device listings are answered without touching the CSVs. Device
+listings are further memoized per directory modification time.
+
+Files are summarized from their columnar copy when it is fresh. Otherwise the time
+index supplies the days and row count and only the first and last day are parsed;
+such entries estimate the sampling interval and null ratio from those two days and
+are refreshed once the columnar copy has been built.
+"""
+
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from core.config import COLUMNAR_CACHE_PATH
+from core.columnar_cache import (
+    read_cache, read_metric_file, typed_metric_frame, schedule_conversion, is_cache_fresh, source_signature
+)
+from core.time_index import ensure_index, read_time_range
+
+CATALOG_VERSION = 1
+CATALOG_FILENAME = "catalog.json"
+
+_catalog_memo: Dict[str, dict] = {}
+_catalog_locks: Dict[str, threading.Lock] = {}
+_memo_lock = threading.Lock()
+_listing_memo: Dict[str, tuple] = {}
+
+
+def catalog_path_for(device_id: str) -> Path:
+    """Location of a device catalog: <cache>/<device_id>/catalog.json"""
+    return COLUMNAR_CACHE_PATH / device_id / CATALOG_FILENAME
+
+
+def _frame_stats(df: pd.DataFrame, signature: Dict[str, int]) -> dict:
+    value_col = [col for col in df.columns if col != 'ts'][0]
+
+    ts = df['ts'].dropna().sort_values()
+    row_count = len(df)
+    stats = {
+        'source_mtime_ns': signature['mtime_ns'],
+        'source_size': signature['size'],
+        'row_count': row_count,
+        'first_ts': ts.iloc[0].isoformat() if len(ts) else None,
+        'last_ts': ts.iloc[-1].isoformat() if len(ts) else None,
+        'median_interval_s': None,
+        'null_ratio': float(df[value_col].isna().mean()) if row_count else 0.0,
+        'days': sorted(ts.dt.strftime('%Y-%m-%d').unique().tolist()),
+    }
+    if len(ts) > 1:
+        intervals = np.diff(ts.values.view('int64')) / 1e9
+        stats['median_interval_s'] = float(np.median(intervals))
+    return stats
+
+
+def compute_file_stats(file_path: Path) -> dict:
+    """Summarize one metric file for the catalog without a full CSV parse where possible"""
+    signature = source_signature(file_path)
+    df = read_cache(file_path)
+    if df is not None:
+        return _frame_stats(df, signature)
+
+    index = ensure_index(file_path)
+    if index is None:
+        return _frame_stats(read_metric_file(file_path), signature)
+
+    days = sorted({segment[0] for segment in index['segments']})
+    edges = sorted({days[0], days[-1]}) if days else []
+    raw = [read_time_range(file_path, day, day) for day in edges]
+    sample = typed_metric_frame(pd.concat(raw, ignore_index=True)) if raw else read_metric_file(file_path, nrows=0)
+    stats = _frame_stats(sample, signature)
+    stats.update(row_count=sum(segment[3] for segment in index['segments']), days=days, estimated=True)
+    schedule_conversion(file_path)
+    return stats
+
+
+def _load_catalog(device_id: str) -> Optional[dict]:
+    target = catalog_path_for(device_id)
+    if not target.exists():
+        return None
+    try:
+        with open(target) as f:
+            catalog = json.load(f)
+        return catalog if catalog.get('version') == CATALOG_VERSION else None
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable catalog {target}: {e}")
+        return None
+
+
+def _save_catalog(device_id: str, catalog: dict):
+    target = catalog_path_for(device_id)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(catalog, f, separators=(',', ':'))
+    os.replace(tmp_path, target)
+
+
+def get_device_catalog(device_path: Path, filenames: Iterable[str]) -> Dict[str, dict]:
+    """
+    Return catalog entries (keyed by filename) for the given metric files of a device.
+    Missing files are left out; new or changed files are rescanned and persisted.
+    """
+    device_id = device_path.name
+    with _memo_lock:
+        lock = _catalog_locks.setdefault(device_id, threading.Lock())
+
+    with lock:
+        catalog = _catalog_memo.get(device_id) or _load_catalog(device_id) or {
+            'version': CATALOG_VERSION, 'device_id': device_id, 'files': {}
+        }
+        files = catalog['files']
+        changed = False
+        result = {}
+
+        for filename in filenames:
+            file_path = device_path / filename
+            if not file_path.exists():
+                if files.pop(filename, None) is not None:
+                    changed = True
+                continue
+
+            entry = files.get(filename)
+            signature = source_signature(file_path)
+            if (entry is None or entry['source_mtime_ns'] != signature['mtime_ns']
+                    or entry['source_size'] != signature['size']
+                    or (entry.get('estimated') and is_cache_fresh(file_path))):
+                try:
+                    entry = compute_file_stats(file_path)
+                except Exception as e:
+                    print(f"WARNING: Could not catalog {file_path}: {e}")
+                    continue
+                files[filename] = entry
+                changed = True
+            result[filename] = entry
+
+        if changed:
+            catalog['updated_at'] = datetime.now().isoformat()
+            _save_catalog(device_id, catalog)
+        _catalog_memo[device_id] = catalog
+        return result
+
+
+def get_device_listing(device_path: Path, metric_files: Dict[str, str]) -> dict:
+    """
+    Summary of a device for listings: metrics with data, rows per metric, overall time
+    span and when its files were last written. Cached until the device directory's
+    modification time changes (files added, removed or replaced), so a fleet listing
+    costs one stat per device.
+    """
+    device_id = device_path.name
+    key = (device_path.stat().st_mtime_ns, tuple(metric_files.items()))
+    memo = _listing_memo.get(device_id)
+    if memo is not None and memo[0] == key:
+        return memo[1]
+
+    entries = get_device_catalog(device_path, metric_files.values())
+    present = {metric: entries[filename] for metric, filename in metric_files.items()
+               if filename in entries and entries[filename]['row_count'] > 0}
+    first_ts = [entry['first_ts'] for entry in present.values() if entry['first_ts']]
+    last_ts = [entry['last_ts'] for entry in present.values() if entry['last_ts']]
+    listing = {
+        'metrics': list(present),
+        'row_counts': {metric: entry['row_count'] for metric, entry in present.items()},
+        'first_ts': min(first_ts) if first_ts else None,
+        'last_ts': max(last_ts) if last_ts else None,
+        'last_modified': max((pd.Timestamp(entry['source_mtime_ns'], unit='ns').isoformat()
+                              for entry in present.values()), default=None),
+    }
+    _listing_memo[device_id] = (key, listing)
+    return listing
+
+
+def days_in_range(entry: dict, start: datetime, end: datetime) -> List[str]:
+    """Days with data for a catalog entry inside [start, end)"""
+    start_day = pd.Timestamp(start).strftime('%Y-%m-%d')
+    end_day = pd.Timestamp(end).strftime('%Y-%m-%d')
+    end_inclusive = pd.Timestamp(end) > pd.Timestamp(end_day)
+    return [day for day in entry['days']
+            if start_day <= day and (day < end_day or (end_inclusive and day == end_day))]
@@ -0,0 +1,238 @@
+"""
+BESS Columnar Cache
+===================
+Typed columnar copies of the per-metric CSV files, stored as Feather (Arrow IPC)
+with int64 epoch-nanosecond timestamps and float32 values. A cached copy is used
+only while the source CSV keeps the modification time and size it was built from;
+stale or missing copies are rebuilt by a background worker.
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Cache is disabled without pyarrow
+    pa = None
+    feather = None
+
+from core.config import COLUMNAR_CACHE_ENABLED, COLUMNAR_CACHE_PATH, COLUMNAR_CACHE_WORKERS
+from core.time_index import read_time_range
+
+CACHE_SUFFIX = ".feather"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def cache_available() -> bool:
+    """Whether the columnar cache can be used in this environment"""
+    return COLUMNAR_CACHE_ENABLED and feather is not None
+
+
+def cache_path_for(file_path: Path) -> Path:
+    """Location of the columnar copy of a metric CSV: <cache>/<device_id>/<metric>.feather"""
+    return COLUMNAR_CACHE_PATH / file_path.parent.name / (file_path.stem + CACHE_SUFFIX)
+
+
+def source_signature(file_path: Path) -> Dict[str, int]:
+    """Modification time and size of a source file, used for cache invalidation"""
+    stat = file_path.stat()
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def parse_metric_csv(file_path: Path, nrows: int = None) -> pd.DataFrame:
+    """
+    Parse a raw metric CSV into the typed frame layout used everywhere else:
+    a datetime64 'ts' column followed by the float32 value column.
+    """
+    df = pd.read_csv(file_path, nrows=nrows)
+    return typed_metric_frame(df)
+
+
+def typed_metric_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce a raw ts/value frame to datetime64 timestamps and float32 values"""
+    value_col = [col for col in df.columns if col != 'ts'][0]
+    return pd.DataFrame({
+        'ts': pd.to_datetime(df['ts']),
+        value_col: pd.to_numeric(df[value_col], errors='coerce').astype(np.float32)
+    })
+
+
+def write_cache(file_path: Path, df: pd.DataFrame = None, signature: Dict[str, int] = None) -> Optional[Path]:
+    """
+    Write the columnar copy of a metric CSV.
+    Reuses an already parsed full frame (and the source signature taken before
+    parsing it) when given, otherwise parses the CSV.
+    """
+    if not cache_available():
+        return None
+
+    # Capture the signature before parsing so a concurrent append marks the copy stale
+    if df is None or signature is None:
+        signature = source_signature(file_path)
+        df = parse_metric_csv(file_path)
+
+    value_col = [col for col in df.columns if col != 'ts'][0]
+    ts_ns = df['ts'].values.astype('datetime64[ns]').view('int64')
+    table = pa.table({
+        'ts': pa.array(ts_ns, type=pa.int64()),
+        value_col: pa.array(df[value_col].values.astype(np.float32), type=pa.float32()),
+    })
+    table = table.replace_schema_metadata({
+        'source_mtime_ns': str(signature['mtime_ns']),
+        'source_size': str(signature['size']),
+        # Sorted copies are range-sliced with a binary search instead of a mask
+        'sorted': str(bool(np.all(ts_ns[1:] >= ts_ns[:-1]))),
+    })
+
+    target = cache_path_for(file_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, target)
+    return target
+
+
+def _matches_source(metadata: dict, file_path: Path) -> bool:
+    """Whether cache metadata was written from the current version of the source file"""
+    signature = source_signature(file_path)
+    return (int(metadata.get(b'source_mtime_ns', -1)) == signature['mtime_ns']
+            and int(metadata.get(b'source_size', -1)) == signature['size'])
+
+
+def is_cache_fresh(file_path: Path) -> bool:
+    """Whether a fresh columnar copy exists, checked from its schema metadata only"""
+    if not cache_available():
+        return False
+
+    target = cache_path_for(file_path)
+    if not target.exists():
+        return False
+
+    try:
+        with pa.memory_map(str(target)) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        return _matches_source(metadata, file_path)
+    except Exception:
+        return False
+
+
+def read_cache(file_path: Path, start: datetime = None, end: datetime = None) -> Optional[pd.DataFrame]:
+    """
+    Read the columnar copy of a metric CSV, or None when missing or stale.
+    With `start`/`end`, only rows inside [start, end] are materialized.
+    """
+    if not cache_available():
+        return None
+
+    target = cache_path_for(file_path)
+    if not target.exists():
+        return None
+
+    try:
+        table = feather.read_table(target, memory_map=True)
+        metadata = table.schema.metadata or {}
+        if not _matches_source(metadata, file_path):
+            return None
+
+        value_col = [name for name in table.column_names if name != 'ts'][0]
+        ts_ns = table.column('ts').to_numpy()
+        values = table.column(value_col).to_numpy(zero_copy_only=False)
+
+        if start is not None or end is not None:
+            start_ns = pd.Timestamp(start).value if start is not None else np.iinfo(np.int64).min
+            end_ns = pd.Timestamp(end).value if end is not None else np.iinfo(np.int64).max
+            if metadata.get(b'sorted') == b'True':
+                lo = np.searchsorted(ts_ns, start_ns, side='left')
+                hi = np.searchsorted(ts_ns, end_ns, side='right')
+                ts_ns, values = ts_ns[lo:hi], values[lo:hi]
+            else:
+                mask = (ts_ns >= start_ns) & (ts_ns <= end_ns)
+                ts_ns, values = ts_ns[mask], values[mask]
+
+        return pd.DataFrame({'ts': ts_ns.view('datetime64[ns]'), value_col: values})
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable columnar cache {target}: {e}")
+        return None
+
+
+def _convert_in_background(file_path: Path, df: pd.DataFrame = None, signature: Dict[str, int] = None):
+    try:
+        write_cache(file_path, df, signature)
+    except Exception as e:
+        print(f"WARNING: Columnar conversion failed for {file_path}: {e}")
+    finally:
+        with _pending_lock:
+            _pending.discard(file_path)
+
+
+def schedule_conversion(file_path: Path, df: pd.DataFrame = None, signature: Dict[str, int] = None):
+    """Queue a background (re)build of the columnar copy, once per file at a time"""
+    global _executor
+    if not cache_available():
+        return
+
+    with _pending_lock:
+        if file_path in _pending:
+            return
+        _pending.add(file_path)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=COLUMNAR_CACHE_WORKERS,
+                                           thread_name_prefix="columnar-cache")
+    _executor.submit(_convert_in_background, file_path, df, signature)
+
+
+def warm_device_cache(device_path: Path) -> int:
+    """
+    Queue conversion of every metric CSV of a device that has no fresh columnar copy;
+    returns the number of files queued. Run by the startup warm-up.
+    """
+    if not cache_available():
+        return 0
+    queued = 0
+    for file_path in sorted(device_path.glob("*.csv")):
+        if not is_cache_fresh(file_path):
+            schedule_conversion(file_path)
+            queued += 1
+    return queued
+
+
+def read_metric_file(file_path: Path, nrows: int = None, start: datetime = None,
+                     end: datetime = None) -> pd.DataFrame:
+    """
+    Load a metric file as a typed ts/value frame.
+    Serves the columnar copy when it is fresh; otherwise parses the CSV and
+    queues a background conversion so the next load is fast.
+
+    With `start`/`end` the result holds at least every row inside [start, end]
+    (whole days when read through the time index), so callers still apply their
+    exact filter. Uncached range reads seek through the CSV's time index.
+    """
+    ranged = start is not None and end is not None
+    cached = read_cache(file_path, start, end) if ranged else read_cache(file_path)
+    if cached is not None:
+        return cached.iloc[:nrows] if nrows is not None else cached
+
+    if ranged and nrows is None:
+        raw = read_time_range(file_path, start, end)
+        if raw is not None:
+            schedule_conversion(file_path)
+            return typed_metric_frame(raw)
+
+    signature = source_signature(file_path)
+    df = parse_metric_csv(file_path, nrows=nrows)
+    # A full parse can be written as-is; a partial read needs its own full conversion
+    if nrows is None:
+        schedule_conversion(file_path, df, signature)
+    else:
+        schedule_conversion(file_path)
+    return df
@@ -23,7 +23,116 @@ DEFAULT_STREAM_INTERVAL = 2.0
 MAX_RECORDS_PER_FILE = 1000
 SAMPLE_SIZE_FOR_TIME_ANALYSIS = 1000
 MAX_UNIFIED_RECORDS = 1000
-TIME_WINDOW_TOLERANCE_MINUTES = 5
+TIME_WINDOW_TOLERANCE_MINUTES = 10
+
+# Response Configuration
+# Build and validate a Pydantic model per reading by default instead of the pre-validated fast path
+STRICT_RESPONSE_VALIDATION = False
+# Encoded (and compressed) response bodies kept for repeat requests
+RESPONSE_CACHE_MAX_MB = 256
+# Smaller bodies are sent uncompressed
+RESPONSE_COMPRESS_MIN_BYTES = 1024
+# Browser/proxy max-age for periods that ended at least a day ago; anything else must revalidate
+RESPONSE_HISTORICAL_MAX_AGE_SECONDS = 86400
+
+# Rollup Configuration
+# Persist min/max/mean/last/count pyramids (1min/15min/1h/1d) in the cache directory
+ROLLUPS_PERSIST = True
+# Pyramids kept in memory, least recently used first; evicted ones are reloaded from disk
+ROLLUP_MEMORY_BUDGET_MB = 256
+DEFAULT_ROLLUP_POINTS = 500
+# Aggregate responses hold at most this many buckets
+MAX_AGGREGATE_BUCKETS = 100000
+
+# Metric Loading Configuration
+# "thread" loads metric files concurrently on a bounded pool, "sequential" one by one
+METRIC_LOAD_MODE = "thread"
+METRIC_LOAD_WORKERS = 8
+# Uncached CSVs at least this large are parsed in a process pool (when enabled)
+METRIC_LOAD_PROCESS_POOL = False
+METRIC_LOAD_PROCESS_MIN_BYTES = 256 * 1024 * 1024
+
+# Downsampling Configuration
+# Decimation of aligned datasets, with rows chosen from every metric: "lttb", "minmax", "mean" or "stride"
+DOWNSAMPLE_MODE = "lttb"
+DOWNSAMPLE_TARGET_POINTS = 2000
+MAX_DOWNSAMPLE_POINTS = 20000
+
+# Manager Cache Configuration
+# Cached device/date managers are evicted least recently used first beyond these limits
+MANAGER_CACHE_MAX_MB = 1024
+MANAGER_CACHE_MAX_ENTRIES = 64
+# Seconds before an unpinned manager is rebuilt (None keeps entries until evicted)
+MANAGER_CACHE_TTL_SECONDS = None
+# Devices whose managers are never evicted automatically
+MANAGER_CACHE_PINNED_DEVICES = []
+
+# Warm-up Configuration
+# Build datasets in the background at startup; traffic is served meanwhile
+WARMUP_ENABLED = True
+# Devices to warm (None warms the pinned devices, or every device directory when none are pinned)
+WARMUP_DEVICES = None
+# Share of the manager cache (entries and bytes) warm-up may fill; the rest is left to requests
+WARMUP_CACHE_SHARE = 0.5
+# Warm each device's most recent day with data besides its default (auto) dataset
+WARMUP_RECENT_DAY = True
+WARMUP_WORKERS = 2
+
+# Fleet Query Configuration
+# Devices loaded and aligned concurrently by a fleet query
+FLEET_QUERY_WORKERS = 8
+# Default number of common grid points when no step is given
+DEFAULT_FLEET_GRID_POINTS = 500
+
+# Fleet Summary Configuration
+# KPI metrics tracked per device for the fleet overview
+FLEET_SUMMARY_METRICS = [
+    "bms_soc", "bms_soh", "bms_cell_ave_t", "bms_cell_t_diff", "bms_cell_max_v", "bms_cell_min_v",
+    "pcs_temp_igbt", "pcs_apparent_power", "bms_current", "safety_smoke_flag",
+]
+# Sign of the pack current while charging; charge and discharge ampere-hours integrate bms_current
+FLEET_CHARGE_CURRENT_SIGN = 1
+# Polls within this many seconds of the last refresh are answered without checking any file
+FLEET_SUMMARY_REFRESH_SECONDS = 5.0
+
+# Streaming Configuration
+# Frames buffered per SSE client; a client that falls further behind is handled by the policy:
+# "coalesce" drops its oldest pending frames, "drop" disconnects it
+STREAM_CLIENT_QUEUE_SIZE = 32
+STREAM_SLOW_CLIENT_POLICY = "coalesce"
+# Comment frames sent on otherwise idle streams so proxies keep the connection open
+STREAM_HEARTBEAT_SECONDS = 15.0
+# Replay streams wait at most this long between frames, however large the recorded gap
+STREAM_REPLAY_MAX_GAP_SECONDS = 10.0
+MAX_STREAM_REPLAY_SPEED = 10000.0
+# WebSocket frames a client may leave unacknowledged before ticks are skipped for it
+WS_MAX_UNACKED_FRAMES = 8
+
+# Full-Resolution Configuration
+# Undecimated timelines are aligned lazily in chunks of this many hours when paging
+FULL_RESOLUTION_CHUNK_HOURS = 24
+# Aligned chunks kept in memory per device timeline before the least recently used is dropped
+FULL_RESOLUTION_MEMORY_BUDGET_MB = 256
+
+# Time Alignment Configuration
+# Direction used to match metric samples onto the base timeline: "nearest", "backward" or "forward"
+DEFAULT_ALIGNMENT_DIRECTION = "nearest"
+# Per-metric overrides, e.g. {"safety_smoke_flag": "backward"} to carry a flag state forward
+METRIC_ALIGNMENT_DIRECTIONS = {}
+
+# Columnar Cache Configuration
+# Typed Feather copies of the metric CSVs, kept next to the raw data directory
+COLUMNAR_CACHE_ENABLED = True
+COLUMNAR_CACHE_PATH = DATA_BASE_PATH.parent / "BESS_cache"
+COLUMNAR_CACHE_WORKERS = 2
+
+# Unified Snapshot Configuration
+# Persist finished unified datasets (in the cache directory) and reuse them while their sources are unchanged
+UNIFIED_SNAPSHOTS_ENABLED = True
+
+# Time Index Configuration
+# Per-CSV day -> byte range sidecars (stored in the cache directory) for date-filtered reads
+TIME_INDEX_ENABLED = True
 
 # CORS Configuration
 CORS_ORIGINS = ["*"]
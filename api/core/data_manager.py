@@ -8,23 +8,133 @@ and provides clean, synchronized data with excellent coverage.
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Iterator, Optional, List, Tuple
 from datetime import datetime, timedelta
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from core.alignment import align_metric, to_epoch_ns
+from core.columnar_cache import read_metric_file, is_cache_fresh
+from core.catalog import get_device_catalog, days_in_range
+from core.downsampling import select_rows, mean_columns
+from core.snapshots import (
+    snapshots_available, settings_hash, snapshot_path_for, source_signatures, read_snapshot, write_snapshot
+)
+from core.config import (
+    TIME_WINDOW_TOLERANCE_MINUTES, DEFAULT_ALIGNMENT_DIRECTION, METRIC_ALIGNMENT_DIRECTIONS,
+    METRIC_LOAD_MODE, METRIC_LOAD_WORKERS, METRIC_LOAD_PROCESS_POOL, METRIC_LOAD_PROCESS_MIN_BYTES,
+    DOWNSAMPLE_MODE, DOWNSAMPLE_TARGET_POINTS
+)
 
 logger = logging.getLogger(__name__)
 
+# Shared, bounded pools for metric loading (created on first use)
+_thread_executor: Optional[ThreadPoolExecutor] = None
+_process_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_load_executor(process: bool = False):
+    """Return the shared metric-loading thread pool, or the process pool for large files"""
+    global _thread_executor, _process_executor
+    with _executor_lock:
+        if process:
+            if _process_executor is None:
+                _process_executor = ProcessPoolExecutor(max_workers=METRIC_LOAD_WORKERS)
+            return _process_executor
+        if _thread_executor is None:
+            _thread_executor = ThreadPoolExecutor(max_workers=METRIC_LOAD_WORKERS,
+                                                  thread_name_prefix="metric-load")
+        return _thread_executor
+
+
+def load_metric_for_period(file_path: Path, start_time: datetime, end_time: datetime,
+                           ranged: bool, max_records: int) -> pd.DataFrame:
+    """
+    Read one metric file and cut it to the period. Module-level so it can run in
+    worker threads or processes.
+    """
+    # Typed frames come from the columnar cache when it is fresh
+    if ranged:
+        # For target dates, read just the target range (via the time index when uncached)
+        df = read_metric_file(file_path, start=start_time, end=end_time)
+    else:
+        # For general queries, limit to reasonable chunk size
+        df = read_metric_file(file_path, nrows=max_records)
+    
+    # Filter to our time period
+    mask = (df['ts'] >= start_time) & (df['ts'] <= end_time)
+    df_filtered = df[mask].copy()
+    
+    if not df_filtered.empty:
+        # Remove duplicates and sort
+        df_filtered = df_filtered.drop_duplicates(subset=['ts']).sort_values('ts').reset_index(drop=True)
+    
+    return df_filtered
+
+def compact_unified_frame(unified_df: pd.DataFrame, flag_metrics=()) -> pd.DataFrame:
+    """
+    Store a unified frame compactly: datetime64 timestamps (int64 underneath),
+    float32 measurements with NaN marking missing values, and binary safety flags
+    as nullable booleans instead of object columns holding None.
+    """
+    columns = {'timestamp': unified_df['timestamp'].values.astype('datetime64[ns]')}
+    for col in unified_df.columns:
+        if col == 'timestamp':
+            continue
+        values = pd.to_numeric(unified_df[col], errors='coerce').to_numpy(dtype=np.float64)
+        if col in flag_metrics:
+            missing = np.isnan(values)
+            columns[col] = pd.arrays.BooleanArray(np.where(missing, 0, values) != 0, missing)
+        else:
+            columns[col] = values.astype(np.float32)
+    return pd.DataFrame(columns)
+
+
+def frame_memory_usage(df: Optional[pd.DataFrame]) -> dict:
+    """Rows, columns and bytes held by a frame, with the bytes per column"""
+    if df is None:
+        return {'rows': 0, 'columns': 0, 'bytes': 0, 'column_bytes': {}}
+    column_bytes = df.memory_usage(index=True, deep=True)
+    return {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'bytes': int(column_bytes.sum()),
+        'column_bytes': {str(col): int(size) for col, size in column_bytes.items()},
+    }
+
+
 class SimpleBESSDataManager:
     """
     Simple approach: Find the best overlapping time period and use actual data.
     Much better than forcing synchronization across completely different time periods.
     """
     
-    def __init__(self, device_id: str, data_base_path: Path, target_date: str = None):
+    def __init__(self, device_id: str, data_base_path: Path, target_date: str = None,
+                 tolerance_minutes: float = TIME_WINDOW_TOLERANCE_MINUTES,
+                 alignment_directions: Dict[str, str] = None,
+                 load_mode: str = None,
+                 target_points: int = None, downsample_mode: str = None,
+                 start_time: datetime = None, end_time: datetime = None):
         self.device_id = device_id
         self.device_path = data_base_path / device_id
         self.target_date = target_date  # Format: "YYYY-MM-DD" or "YYYY-MM" for month
         
+        # Explicit [start_time, end_time) range; takes precedence over target_date
+        self.start_time = start_time
+        self.end_time = end_time
+
+        # Metric loading: "thread" loads files concurrently on the shared pools, "sequential" one at a time
+        self.load_mode = load_mode or METRIC_LOAD_MODE
+        
+        # Decimation of the aligned dataset, with rows chosen from the base metric
+        self.target_points = target_points or DOWNSAMPLE_TARGET_POINTS
+        self.downsample_mode = downsample_mode or DOWNSAMPLE_MODE
+        
+        # Alignment settings: max distance to the matched sample and per-metric match direction
+        self.tolerance = pd.Timedelta(minutes=tolerance_minutes)
+        self.alignment_directions = {**METRIC_ALIGNMENT_DIRECTIONS, **(alignment_directions or {})}
+        
         # Essential BESS metrics only - streamlined for performance and clarity
         self.core_metrics = {
             # 1. BMS Core KPIs - Battery Management System
@@ -76,11 +186,22 @@ class SimpleBESSDataManager:
             # All other safety sensor arrays (fa1-fa5 CO, fire levels, VOC, temp sensors) removed
         }
         
+        # Binary safety flags, kept as nullable booleans in the unified data
+        self.flag_metrics = {"safety_smoke_flag"}
+        
         self.unified_data = None
         self.data_quality = {}
+        # Time span the unified data fully represents (shorter than the period when truncated)
+        self.loaded_range = None
+        # Whether rows of that span were dropped by decimation (slices of it are then sparser
+        # than a dataset built for the slice alone)
+        self.decimated = None
         
     def get_target_date_range(self):
-        """Get start and end dates based on target_date parameter"""
+        """Get start and end dates based on the explicit range or the target_date parameter"""
+        if self.start_time and self.end_time:
+            return self.start_time, self.end_time
+        
         if not self.target_date:
             return None, None
             
@@ -111,10 +232,26 @@ class SimpleBESSDataManager:
             print(f"Error parsing target date {self.target_date}: {e}")
             return None, None
         
+    def get_metric_files(self) -> Dict[str, str]:
+        """All metric names (core first, then additional) mapped to their CSV filenames"""
+        return {**self.core_metrics, **self.additional_metrics}
+    
+    def get_metric_catalog(self) -> Dict[str, dict]:
+        """
+        Catalog entries (first/last timestamp, rows, sampling interval, null ratio, days)
+        for every metric file of this device, keyed by metric name.
+        """
+        all_metrics = self.get_metric_files()
+        entries = get_device_catalog(self.device_path, all_metrics.values())
+        return {metric: entries[filename] for metric, filename in all_metrics.items() if filename in entries}
+    
     def find_best_time_period(self, sample_size: int = 1000) -> Tuple[datetime, datetime]:
         """
         Find the time period with the most overlapping data from core metrics.
         If target_date is specified, filter to that specific date/month.
+        Metric time spans come from the device catalog instead of sampled CSV reads, so
+        without a target date the period is the overlap of the whole core metric files
+        rather than of their first few thousand rows.
         """
         print(f"Finding best time period for {self.device_id}...")
         
@@ -123,43 +260,47 @@ class SimpleBESSDataManager:
         if target_start and target_end:
             print(f"Filtering to target date range: {target_start} to {target_end}")
         
-        # Load samples from core metrics to find overlap
+        catalog = self.get_metric_catalog()
         time_ranges = []
         
         for metric, filename in self.core_metrics.items():
-            file_path = self.device_path / filename
-            if file_path.exists():
-                try:
-                    # When we have a target date, read entire file to ensure we find the data
-                    if target_start and target_end:
-                        # For target dates, read entire file to ensure we don't miss data
-                        df_sample = pd.read_csv(file_path)
-                        df_sample['ts'] = pd.to_datetime(df_sample['ts'])
-                        
-                        # Filter by target date
-                        mask = (df_sample['ts'] >= target_start) & (df_sample['ts'] < target_end)
-                        df_filtered = df_sample[mask]
-                        
-                        if len(df_filtered) == 0:
-                            print(f"WARNING: No data for {metric} in target date range")
-                            continue
-                            
-                        df_sample = df_filtered
-                    else:
-                        # For general queries without target date, use sample
-                        df_sample = pd.read_csv(file_path, nrows=sample_size * 5)
-                        df_sample['ts'] = pd.to_datetime(df_sample['ts'])
+            entry = catalog.get(metric)
+            if entry is None or entry['row_count'] == 0:
+                continue
+            
+            try:
+                if target_start and target_end:
+                    # The catalog knows which days hold data; only those metrics are read
+                    if not days_in_range(entry, target_start, target_end):
+                        print(f"WARNING: No data for {metric} in target date range")
+                        continue
+                    
+                    df_sample = read_metric_file(self.device_path / filename, start=target_start, end=target_end)
+                    mask = (df_sample['ts'] >= target_start) & (df_sample['ts'] < target_end)
+                    df_filtered = df_sample[mask]
+                    
+                    if len(df_filtered) == 0:
+                        print(f"WARNING: No data for {metric} in target date range")
+                        continue
                     
                     time_ranges.append({
                         'metric': metric,
-                        'start': df_sample['ts'].min(),
-                        'end': df_sample['ts'].max(),
-                        'count': len(df_sample)
+                        'start': df_filtered['ts'].min(),
+                        'end': df_filtered['ts'].max(),
+                        'count': len(df_filtered)
                     })
-                    
-                except Exception as e:
-                    print(f"WARNING: Could not sample {metric}: {e}")
-                    continue
+                else:
+                    # Without a target date the whole file span is known from metadata
+                    time_ranges.append({
+                        'metric': metric,
+                        'start': pd.Timestamp(entry['first_ts']),
+                        'end': pd.Timestamp(entry['last_ts']),
+                        'count': entry['row_count']
+                    })
+                
+            except Exception as e:
+                print(f"WARNING: Could not sample {metric}: {e}")
+                continue
         
         if not time_ranges:
             raise ValueError("No core metrics available for time period analysis")
@@ -199,44 +340,28 @@ class SimpleBESSDataManager:
         # Use target date range if specified, otherwise use provided times
         target_start, target_end = self.get_target_date_range()
         if target_start and target_end:
-            start_time, end_time = target_start, target_end
-            print(f"Loading data for TARGET DATE: {start_time.date()} to {end_time.date()}")
+            # Samples within the tolerance outside the range still match rows at its edges
+            start_time, end_time = target_start - self.tolerance, target_end + self.tolerance
+            print(f"Loading data for TARGET DATE: {target_start.date()} to {target_end.date()}")
         else:
             print(f"Loading data for period {start_time} to {end_time}...")
         
         loaded_data = {}
-        all_metrics = {**self.core_metrics, **self.additional_metrics}
+        all_metrics = self.get_metric_files()
+        ranged = bool(target_start)
         
+        # Submit every metric, then collect in metric order so output is deterministic
+        pending = {}
         for metric, filename in all_metrics.items():
             file_path = self.device_path / filename
             if not file_path.exists():
                 continue
-                
+            pending[metric] = self._submit_metric_load(file_path, start_time, end_time, ranged, max_records)
+        
+        for metric, future in pending.items():
             try:
-                # When we have a specific target date, we need to read the entire file
-                # to ensure we don't miss data that might be located anywhere in the file
-                if target_start:
-                    # For target dates, read the entire file to ensure we find all data
-                    df = pd.read_csv(file_path)
-                else:
-                    # For general queries, limit to reasonable chunk size
-                    df = pd.read_csv(file_path, nrows=max_records)
-                
-                df['ts'] = pd.to_datetime(df['ts'])
-                
-                # Filter to our time period
-                mask = (df['ts'] >= start_time) & (df['ts'] <= end_time)
-                df_filtered = df[mask].copy()
-                
+                df_filtered = future.result()
                 if not df_filtered.empty:
-                    # Keep more data for better interpolation, but limit to reasonable size
-                    if len(df_filtered) > 2000:
-                        # Sample evenly to keep data distributed across the time period
-                        step = len(df_filtered) // 2000
-                        df_filtered = df_filtered.iloc[::step].reset_index(drop=True)
-                    
-                    # Remove duplicates and sort
-                    df_filtered = df_filtered.drop_duplicates(subset=['ts']).sort_values('ts').reset_index(drop=True)
                     loaded_data[metric] = df_filtered
                     print(f"SUCCESS {metric}: {len(df_filtered)} records from {df_filtered['ts'].min()} to {df_filtered['ts'].max()}")
                 else:
@@ -248,10 +373,113 @@ class SimpleBESSDataManager:
         
         return loaded_data
     
+    def _submit_metric_load(self, file_path: Path, start_time: datetime, end_time: datetime,
+                            ranged: bool, max_records: int) -> Future:
+        """Run one metric load inline, on the shared thread pool, or on the process pool for large CSVs"""
+        args = (file_path, start_time, end_time, ranged, max_records)
+        
+        # Pool sizes are process-wide (METRIC_LOAD_WORKERS), so concurrent managers share one bound
+        if self.load_mode == "sequential" or METRIC_LOAD_WORKERS <= 1:
+            future = Future()
+            try:
+                future.set_result(load_metric_for_period(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        # Parsing a big uncached CSV holds the GIL, so it goes to a separate process
+        if (METRIC_LOAD_PROCESS_POOL and file_path.stat().st_size >= METRIC_LOAD_PROCESS_MIN_BYTES
+                and not is_cache_fresh(file_path)):
+            return _get_load_executor(process=True).submit(load_metric_for_period, *args)
+        
+        return _get_load_executor(process=False).submit(load_metric_for_period, *args)
+    
+    def _choose_base_metric(self, candidates: List[str]) -> str:
+        """
+        The most densely sampled metric by the catalog's median sampling interval (ties go
+        to the first candidate), so every period of a device shares the same base timeline
+        """
+        catalog = self.get_metric_catalog()
+        
+        def sampling_interval(metric):
+            interval = catalog.get(metric, {}).get('median_interval_s')
+            return interval if interval is not None else float('inf')
+        
+        return min(candidates, key=sampling_interval)
+    
+    def _snapshot_eligible(self) -> bool:
+        """Only canonical datasets are snapshotted: the auto period, a day or a month, with default decimation"""
+        return (self.start_time is None and self.end_time is None
+                and self.target_points == DOWNSAMPLE_TARGET_POINTS and self.downsample_mode == DOWNSAMPLE_MODE)
+    
+    def _snapshot_settings(self, max_records: int) -> dict:
+        """Everything besides the time range and sources that shapes a unified dataset"""
+        return {
+            'metrics': self.get_metric_files(),
+            'flag_metrics': sorted(self.flag_metrics),
+            'tolerance_s': self.tolerance.total_seconds(),
+            'default_direction': DEFAULT_ALIGNMENT_DIRECTION,
+            'alignment_directions': self.alignment_directions,
+            'target_points': self.target_points,
+            'downsample_mode': self.downsample_mode,
+            'max_records': max_records,
+        }
+    
+    def _restore_snapshot(self, snapshot_path: Path, sources: dict) -> Optional[pd.DataFrame]:
+        restored = read_snapshot(snapshot_path, sources)
+        if restored is None:
+            return None
+        unified_df, info = restored
+        self.data_quality = info['data_quality']
+        self.loaded_range = tuple(pd.Timestamp(ts) for ts in info['loaded_range'])
+        self.decimated = info.get('decimated', True)
+        self.unified_data = unified_df
+        print(f"Loaded unified snapshot for {self.device_id} with {len(unified_df)} records")
+        return unified_df
+    
+    def _align(self, base_ns: np.ndarray, metric: str, df: pd.DataFrame):
+        value_col = [col for col in df.columns if col != 'ts'][0]
+        direction = self.alignment_directions.get(metric, DEFAULT_ALIGNMENT_DIRECTION)
+        return align_metric(base_ns, to_epoch_ns(df['ts']), df[value_col].values, self.tolerance, direction)
+    
+    def _aligned_metrics(self, base_ns: np.ndarray, raw_data: Dict[str, pd.DataFrame], base_metric: str,
+                         base_values: np.ndarray) -> Iterator[Tuple[str, np.ndarray]]:
+        """Yield (metric, values on the base timeline), base metric first, tracking data quality"""
+        yield base_metric, base_values
+        for metric, df in raw_data.items():
+            if metric == base_metric:
+                continue
+            aligned_values, offsets = self._align(base_ns, metric, df)
+            
+            # Track data quality
+            valid = ~np.isnan(aligned_values)
+            non_null_count = int(valid.sum())
+            matched_offsets = offsets[~np.isnan(offsets)]
+            coverage = non_null_count / len(aligned_values) if len(aligned_values) > 0 else 0
+            self.data_quality[metric] = {
+                'coverage': coverage,
+                'total_points': len(aligned_values),
+                'valid_points': non_null_count,
+                'avg_time_diff': float(matched_offsets.mean()) if len(matched_offsets) > 0 else 0
+            }
+            yield metric, aligned_values
+    
     def create_unified_dataset(self, max_records: int = 1000) -> pd.DataFrame:
         """
-        Create a unified dataset with the best available data
+        Create a unified dataset with the best available data.
+        Served from a persisted snapshot when one matches the settings and sources.
         """
+        snapshot_path = sources = None
+        if snapshots_available() and self._snapshot_eligible():
+            metric_files = self.get_metric_files()
+            # Signatures are taken before any source is read, so a concurrent change marks the snapshot stale
+            sources = source_signatures(self.device_path, metric_files.values())
+            snapshot_path = snapshot_path_for(self.device_id, self.target_date,
+                                              settings_key=settings_hash(self._snapshot_settings(max_records)))
+            restored = self._restore_snapshot(snapshot_path, sources)
+            if restored is not None:
+                return restored
+        
         print(f"Creating unified dataset for {self.device_id}...")
         
         # Check if we have a target date specified
@@ -270,63 +498,58 @@ class SimpleBESSDataManager:
         if not raw_data:
             raise ValueError("No data available for the selected time period")
         
+        # Only rows inside the period make up the timeline; loads include the alignment margin
+        in_period = {metric: df[(df['ts'] >= start_time) & (df['ts'] <= end_time)] for metric, df in raw_data.items()}
+        
+        candidates = [metric for metric, df in in_period.items() if not df.empty]
+        if not candidates:
+            raise ValueError("No data available for the selected time period")
+        
         # Find the metric with the most regular timestamps to use as base
-        base_metric = max(raw_data.keys(), key=lambda k: len(raw_data[k]))
-        base_df = raw_data[base_metric].copy()
+        base_metric = self._choose_base_metric(candidates)
+        base_df = in_period[base_metric].reset_index(drop=True)
         
         print(f"Using {base_metric} as base timeline ({len(base_df)} records)")
         
-        # Create unified dataframe starting with base timeline
-        unified_df = base_df[['ts']].copy()
-        unified_df = unified_df.rename(columns={'ts': 'timestamp'})
-        
-        # Add data from base metric
         value_col = [col for col in base_df.columns if col != 'ts'][0]
-        unified_df[base_metric] = base_df[value_col].values
+        base_values = base_df[value_col].values
+        base_ns = to_epoch_ns(base_df['ts'])
+        timestamps = base_df['ts'].values
         
-        # Add other metrics by finding closest timestamps with improved interpolation
-        for metric, df in raw_data.items():
-            if metric == base_metric:
-                continue
-                
-            value_col = [col for col in df.columns if col != 'ts'][0]
-            
-            # For each timestamp in our unified timeline, find the closest data point
-            unified_values = []
-            for target_time in unified_df['timestamp']:
-                # Find closest timestamp within a reasonable window
-                time_diffs = abs(df['ts'] - target_time)
-                closest_idx = time_diffs.idxmin()
-                min_diff = time_diffs.iloc[closest_idx]
-                
-                # Use wider time window (10 minutes) for better data coverage
-                # but prioritize closer matches
-                if min_diff <= pd.Timedelta(minutes=10):
-                    closest_value = df.loc[closest_idx, value_col]
-                    # Skip NaN/invalid values
-                    if pd.notna(closest_value) and closest_value != '' and str(closest_value).lower() != 'nan':
-                        unified_values.append(float(closest_value))
-                    else:
-                        unified_values.append(None)
-                else:
-                    unified_values.append(None)
-            
-            unified_df[metric] = unified_values
-            
-            # Track data quality
-            non_null_count = sum(1 for v in unified_values if v is not None)
-            coverage = non_null_count / len(unified_values) if len(unified_values) > 0 else 0
-            self.data_quality[metric] = {
-                'coverage': coverage,
-                'total_points': len(unified_values),
-                'valid_points': non_null_count,
-                'avg_time_diff': min_diff.total_seconds() if len(unified_values) > 0 else 0
-            }
+        # Time span the dataset represents, before decimation and the record cap
+        if target_start and target_end:
+            self.loaded_range = (start_time, end_time)
+        else:
+            # Auto periods load a prefix of each file, so only the built timeline is known
+            self.loaded_range = (base_df['ts'].iloc[0], base_df['ts'].iloc[-1])
+        
+        # Other metrics are aligned one at a time with a vectorized as-of join; when the
+        # timeline is decimated each one is reduced right away instead of kept in full
+        aligned = self._aligned_metrics(base_ns, raw_data, base_metric, base_values)
+        if self.target_points <= 0 or len(base_df) <= self.target_points:
+            unified_df = pd.DataFrame({'timestamp': timestamps, **dict(aligned)})
+        elif self.downsample_mode == "mean":
+            x = (base_ns - base_ns[0]) / 1e9
+            mean_x, means = mean_columns(x, aligned, self.target_points, self.flag_metrics)
+            timestamps = (base_ns[0] + np.round(mean_x * 1e9).astype(np.int64)).view('datetime64[ns]')
+            unified_df = pd.DataFrame({'timestamp': timestamps, **means})
+        else:
+            x = (base_ns - base_ns[0]) / 1e9
+            n_columns = sum(metric not in self.flag_metrics for metric in raw_data)
+            rows = select_rows(x, aligned, n_columns, self.target_points, self.downsample_mode, self.flag_metrics)
+            # Only the kept rows are aligned again, with the same result as aligning everything
+            unified_df = pd.DataFrame({'timestamp': timestamps[rows], base_metric: base_values[rows]})
+            for metric, df in raw_data.items():
+                if metric != base_metric:
+                    unified_df[metric] = self._align(base_ns[rows], metric, df)[0]
+        self.decimated = len(unified_df) < len(base_df)
         
         # Limit the final dataset size
         if len(unified_df) > max_records:
             unified_df = unified_df.iloc[:max_records].copy()
+            self.loaded_range = (start_time, unified_df['timestamp'].iloc[-1])
         
+        unified_df = compact_unified_frame(unified_df, self.flag_metrics)
         print(f"Created unified dataset with {len(unified_df)} records and {len(unified_df.columns)-1} metrics")
         
         # Show data quality summary with time alignment info
@@ -347,6 +570,16 @@ class SimpleBESSDataManager:
             print(f"   {metric}: {coverage:.1%} coverage {status}{time_info}")
         
         self.unified_data = unified_df
+        
+        if snapshot_path is not None:
+            try:
+                write_snapshot(snapshot_path, unified_df, sources, {
+                    'data_quality': self.data_quality,
+                    'loaded_range': [pd.Timestamp(ts).isoformat() for ts in self.loaded_range],
+                    'decimated': self.decimated,
+                })
+            except Exception as e:
+                print(f"WARNING: Could not write unified snapshot {snapshot_path}: {e}")
         return unified_df
     
     def get_batch_data(self, batch_size: int = 100, skip: int = 0):
@@ -361,6 +594,10 @@ class SimpleBESSDataManager:
         
         return self.unified_data.iloc[start_idx:end_idx].copy()
     
+    def memory_usage(self) -> dict:
+        """Memory held by the unified dataset"""
+        return frame_memory_usage(self.unified_data)
+    
     def get_summary(self):
         """
         Get summary of available data
@@ -0,0 +1,102 @@
+"""
+BESS Delta Streams
+==================
+Per-connection state for WebSocket subscriptions: a set of devices, the metric
+subset the client displays, and the values last sent for each device. Frames
+carry only values that changed since that client's previous frame (null when a
+value disappeared), and at most `window` frames may be unacknowledged, so a
+client that stops acking stops costing encode time and bandwidth.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.config import WS_MAX_UNACKED_FRAMES
+
+# (timestamp text, {metric: value or None}) for a device position, or None past the end
+RowReader = Callable[[str, int, List[str]], Optional[Tuple[str, Dict[str, Any]]]]
+
+
+def delta_values(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Values of `current` that differ from `previous`; metrics no longer present become None"""
+    changed = {metric: value for metric, value in current.items() if previous.get(metric) != value}
+    for metric in previous:
+        if metric not in current and previous[metric] is not None:
+            changed[metric] = None
+    return changed
+
+
+class DeltaSubscription:
+    """Devices, metric subset, per-device cursor and last-sent values of one client"""
+
+    def __init__(self, metrics: List[str], window: int = WS_MAX_UNACKED_FRAMES):
+        self.metrics = list(metrics)
+        self.window = window
+        self.devices: Dict[str, dict] = {}
+        self.seq = 0
+        self.acked = 0
+        self.skipped_ticks = 0
+
+    def subscribe(self, device_ids: Iterable[str], metrics: Optional[List[str]] = None):
+        """Add devices (starting from their first reading); a new metric subset resends full values"""
+        if metrics is not None and list(metrics) != self.metrics:
+            self.metrics = list(metrics)
+            for state in self.devices.values():
+                state['last'] = {}
+        for device_id in device_ids:
+            self.devices.setdefault(device_id, {'position': 0, 'last': {}})
+
+    def unsubscribe(self, device_ids: Iterable[str]):
+        for device_id in device_ids:
+            self.devices.pop(device_id, None)
+
+    def ack(self, seq: int):
+        """Frames up to `seq` were processed by the client; `seq` must be a non-negative integer"""
+        if isinstance(seq, bool) or not isinstance(seq, int) or seq < 0:
+            raise ValueError(f"Invalid ack seq: {seq!r}. Use the seq of a received frame")
+        self.acked = max(self.acked, min(seq, self.seq))
+
+    @property
+    def in_flight(self) -> int:
+        return self.seq - self.acked
+
+    def can_send(self) -> bool:
+        return bool(self.devices) and self.in_flight < self.window
+
+    def next_frame(self, read_row: RowReader) -> Optional[dict]:
+        """
+        Advance every device by one reading and return the frame of deltas, or None
+        when the window is full (the tick is skipped, nothing is read or encoded).
+        Devices wrap to their first reading after the last one.
+        """
+        if not self.can_send():
+            if self.devices:
+                self.skipped_ticks += 1
+            return None
+
+        devices = {}
+        for device_id, state in list(self.devices.items()):
+            row = read_row(device_id, state['position'], self.metrics)
+            if row is None and state['position'] > 0:
+                state['position'] = 0
+                row = read_row(device_id, 0, self.metrics)
+            if row is None:
+                continue
+            timestamp, values = row
+            state['position'] += 1
+            devices[device_id] = {'t': timestamp, 'v': delta_values(state['last'], values)}
+            state['last'] = values
+
+        if not devices:
+            return None
+        self.seq += 1
+        return {'type': 'frame', 'seq': self.seq, 'devices': devices}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'devices': list(self.devices),
+            'metrics': self.metrics,
+            'seq': self.seq,
+            'acked': self.acked,
+            'window': self.window,
+            'skipped_ticks': self.skipped_ticks,
+        }
@@ -0,0 +1,180 @@
+"""
+BESS Downsampling
+=================
+Shape-preserving decimation of aligned datasets for charting:
+
+- lttb:   Largest-Triangle-Three-Buckets, keeps visually significant points
+- minmax: the min and max sample of every bucket
+- mean:   one averaged point per bucket
+- stride: every n-th sample (the previous behaviour)
+
+lttb and minmax pick rows for every metric on its own, from an equal share of the
+target, and keep the union, so a current spike or temperature peak survives even
+when it is not in the base metric. Every mode keeps the rows on both sides of each
+flag transition; mean reports the bucket maximum of flags instead of averaging them.
+
+Decimation picks rows of the base timeline, so every metric keeps the timestamps
+it was aligned on. Metrics are passed one at a time, so a caller can align, reduce
+and drop each metric in turn instead of holding the whole undecimated frame. All
+modes run in linear time over NumPy arrays.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Collection, Dict, Iterable, Tuple
+
+DOWNSAMPLE_MODES = ("lttb", "minmax", "mean", "stride")
+
+
+def _bucket_edges(start: int, stop: int, n_buckets: int) -> np.ndarray:
+    """Evenly sized bucket boundaries over [start, stop)"""
+    return np.linspace(start, stop, n_buckets + 1).astype(np.int64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points chosen by Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = _bucket_edges(1, n - 1, n_out - 2)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average point of every bucket, used as the third triangle vertex of the previous bucket
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    next_x = np.append(avg_x[1:], x[n - 1])
+    next_y = np.append(avg_y[1:], y[n - 1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = starts[i], ends[i]
+        bucket_x, bucket_y = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - next_x[i]) * (bucket_y - y[a]) - (x[a] - bucket_x) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the min and max sample of each of n_out / 2 buckets, in time order"""
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+
+    edges = _bucket_edges(0, n, n_buckets)
+    starts = edges[:-1]
+    bucket_ids = np.repeat(np.arange(n_buckets), np.diff(edges))
+
+    bucket_min = np.minimum.reduceat(y, starts)
+    bucket_max = np.maximum.reduceat(y, starts)
+
+    min_idx = _first_hit_per_bucket(y == bucket_min[bucket_ids], bucket_ids)
+    max_idx = _first_hit_per_bucket(y == bucket_max[bucket_ids], bucket_ids)
+    return np.unique(np.concatenate((min_idx, max_idx)))
+
+
+def _first_hit_per_bucket(hits: np.ndarray, bucket_ids: np.ndarray) -> np.ndarray:
+    """First position of every bucket where `hits` is set; bucket ids are non-decreasing"""
+    positions = np.flatnonzero(hits)
+    hit_buckets = bucket_ids[positions]
+    first = np.ones(len(positions), dtype=bool)
+    first[1:] = hit_buckets[1:] != hit_buckets[:-1]
+    return positions[first]
+
+
+def mean_buckets(x: np.ndarray, y: np.ndarray, n_out: int):
+    """Average time and value of each of n_out buckets; NaN values are left out of the means"""
+    n = len(x)
+    if n_out >= n:
+        return x, y
+
+    edges = _bucket_edges(0, n, n_out)
+    starts = edges[:-1]
+    present = ~np.isnan(y)
+    counts = np.add.reduceat(present.astype(np.int64), starts)
+    totals = np.add.reduceat(np.where(present, y, 0.0), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, totals / counts, np.nan)
+    return np.add.reduceat(x, starts) / np.diff(edges), means
+
+
+def flag_transition_rows(y: np.ndarray) -> np.ndarray:
+    """Rows on both sides of every change of a flag's value; missing values are skipped"""
+    positions = np.flatnonzero(~np.isnan(y))
+    changes = np.flatnonzero(y[positions][1:] != y[positions][:-1])
+    return np.union1d(positions[changes], positions[changes + 1])
+
+
+def _column_rows(x: np.ndarray, y: np.ndarray, n_out: int, mode: str) -> np.ndarray:
+    # NaN rows carry no shape; rows are chosen among the others
+    positions = np.flatnonzero(~np.isnan(y))
+    if len(positions) <= n_out:
+        return positions
+    if mode == "lttb":
+        return positions[lttb_indices(x[positions], y[positions], n_out)]
+    return positions[minmax_indices(y[positions], n_out)]
+
+
+def select_rows(x: np.ndarray, columns: Iterable[Tuple[str, np.ndarray]], n_columns: int, n_out: int,
+                mode: str, flag_metrics: Collection[str] = ()) -> np.ndarray:
+    """
+    Sorted positions of the rows kept by lttb, minmax or stride. `columns` yields
+    (name, values) pairs over the rows of `x`; `n_columns` of them are not flags and
+    share the target evenly (at least 3 rows each). Flag transitions come on top.
+    """
+    n = len(x)
+    share = max(n_out // max(n_columns, 1), 3)
+    picked = [np.arange(0, n, -(-n // n_out))] if mode == "stride" else []
+    for name, y in columns:
+        if name in flag_metrics:
+            picked.append(flag_transition_rows(y))
+        elif mode != "stride":
+            picked.append(_column_rows(x, y, share, mode))
+    return np.unique(np.concatenate(picked)) if picked else np.arange(0)
+
+
+def mean_columns(x: np.ndarray, columns: Iterable[Tuple[str, np.ndarray]], n_out: int,
+                 flag_metrics: Collection[str] = ()) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Average time of each of n_out buckets and every column's bucket means (bucket maximum for flags)"""
+    edges = _bucket_edges(0, len(x), n_out)
+    means = {}
+    for name, y in columns:
+        if name in flag_metrics:
+            means[name] = np.fmax.reduceat(y, edges[:-1])
+        else:
+            means[name] = mean_buckets(x, y, n_out)[1]
+    return np.add.reduceat(x, edges[:-1]) / np.diff(edges), means
+
+
+def downsample(df: pd.DataFrame, n_out: int, mode: str = "lttb", flag_metrics: Collection[str] = ()) -> pd.DataFrame:
+    """
+    Reduce a sorted, aligned frame (a 'timestamp' column plus metric columns) to
+    about `n_out` rows, plus the rows around flag transitions. Frames at or below
+    the target are returned unchanged.
+    """
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"Invalid downsample mode: {mode}. Use one of {DOWNSAMPLE_MODES}")
+    if n_out <= 0 or len(df) <= n_out:
+        return df
+
+    ts_ns = df['timestamp'].values.astype('datetime64[ns]').view('int64')
+    # Seconds from the first row keep the triangle areas well inside float64 range
+    x = (ts_ns - ts_ns[0]) / 1e9
+    names = [col for col in df.columns if col != 'timestamp']
+    columns = ((name, pd.to_numeric(df[name]).to_numpy(dtype=np.float64)) for name in names)
+
+    if mode == "mean":
+        mean_x, means = mean_columns(x, columns, n_out, flag_metrics)
+        timestamps = (ts_ns[0] + np.round(mean_x * 1e9).astype(np.int64)).view('datetime64[ns]')
+        return pd.DataFrame({'timestamp': timestamps, **means})
+
+    n_columns = sum(name not in flag_metrics for name in names)
+    rows = select_rows(x, columns, n_columns, n_out, mode, flag_metrics)
+    return df.iloc[rows].reset_index(drop=True)
@@ -0,0 +1,172 @@
+"""
+BESS Fleet Summary
+==================
+Running KPI state per device for fleet overviews: latest value of each KPI
+metric, min/max/mean of its latest day, cumulative charge and discharge
+ampere-hours integrated from the signed pack current, and alarm flags. State is read from the rollup pyramids, which are extended
+incrementally when files grow, and a metric is only revisited when its file
+changes (a file that fails to summarize is skipped until it changes again);
+throughput keeps a running total of closed minutes, so an append adds just the
+new minutes. Latest timestamps are the last minute with data. A poll within the
+refresh period costs nothing.
+"""
+
+import time
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.columnar_cache import source_signature
+from core.rollups import get_pyramid
+from core.time_index import head_fingerprint
+from core.config import FLEET_SUMMARY_METRICS, FLEET_SUMMARY_REFRESH_SECONDS, FLEET_CHARGE_CURRENT_SIGN
+
+THROUGHPUT_METRIC = "bms_current"
+ALARM_METRICS = ("safety_smoke_flag",)
+
+_HOURS_PER_MINUTE = 1 / 60
+
+
+def _value(value) -> Optional[float]:
+    """Reading for JSON at float32 precision (3.3, not 3.2999999523), None for NaN"""
+    return None if value is None or pd.isna(value) else float(str(np.float32(value)))
+
+
+class FleetSummary:
+    """Per-device KPI state, refreshed from metric files that changed since the last poll"""
+
+    def __init__(self, data_base_path: Path, metrics: List[str] = FLEET_SUMMARY_METRICS,
+                 refresh_seconds: float = FLEET_SUMMARY_REFRESH_SECONDS):
+        self.data_base_path = data_base_path
+        self.metrics = list(metrics)
+        self.refresh_seconds = refresh_seconds
+
+        self._metric_state: Dict[tuple, dict] = {}  # (device_id, metric) -> state
+        self._throughput: Dict[str, dict] = {}      # device_id -> running totals
+        self._refreshed_at = 0.0
+        self._summary: Dict[str, Any] = {}
+        # Versions restart with the process; created_at tells the runs apart
+        self.created_at = time.time()
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def _metric_summary(self, device_path: Path, metric: str, filename: str, appended: bool) -> dict:
+        levels = get_pyramid(device_path / filename)
+        minutes, days = levels["1min"], levels["1d"]
+        present = minutes[minutes['count'] > 0]
+        summary = {'latest': None, 'latest_at': None,
+                   'day': None, 'day_min': None, 'day_max': None, 'day_mean': None}
+        if len(present):
+            summary['latest'] = _value(present['last'].iloc[-1])
+            summary['latest_at'] = pd.Timestamp(int(present['bucket'].iloc[-1])).isoformat()
+        day = days[days['count'] > 0]
+        if len(day):
+            row = day.iloc[-1]
+            summary.update(day=pd.Timestamp(int(row['bucket'])).strftime('%Y-%m-%d'),
+                           day_min=_value(row['min']), day_max=_value(row['max']), day_mean=_value(row['mean']))
+        if metric == THROUGHPUT_METRIC:
+            if not appended:
+                self._throughput.pop(device_path.name, None)
+            self._update_throughput(device_path.name, minutes)
+        return summary
+
+    def _update_throughput(self, device_id: str, minutes: pd.DataFrame):
+        """
+        Add the minutes closed since the last update to the running totals; the last
+        (possibly still filling) minute is recomputed each time. Minutes without data
+        are not integrated.
+        """
+        totals = self._throughput.setdefault(device_id, {'closed_until': None, 'charge': 0.0, 'discharge': 0.0})
+        buckets = minutes['bucket'].to_numpy()
+        if not len(buckets):
+            return
+
+        start = 0 if totals['closed_until'] is None else int(np.searchsorted(buckets, totals['closed_until']))
+        closed_end = len(buckets) - 1
+        # Charging current counts positive from here on
+        means = np.nan_to_num(minutes['mean'].to_numpy(dtype=np.float64)[start:closed_end]) * FLEET_CHARGE_CURRENT_SIGN
+        totals['charge'] += float(means[means > 0].sum()) * _HOURS_PER_MINUTE
+        totals['discharge'] += float(-means[means < 0].sum()) * _HOURS_PER_MINUTE
+        totals['closed_until'] = int(buckets[-1])
+
+        partial = float(np.nan_to_num(minutes['mean'].iloc[-1])) * FLEET_CHARGE_CURRENT_SIGN
+        totals['open_charge'] = max(partial, 0.0) * _HOURS_PER_MINUTE
+        totals['open_discharge'] = max(-partial, 0.0) * _HOURS_PER_MINUTE
+
+    def _refresh_device(self, device_path: Path, metric_files: Dict[str, str]) -> bool:
+        """Revisit the metrics of one device whose files changed; returns whether any did"""
+        device_id = device_path.name
+        wanted = {metric: metric_files[metric] for metric in self.metrics if metric in metric_files}
+        changed = False
+        for metric, filename in wanted.items():
+            file_path = device_path / filename
+            key = (device_id, metric)
+            signature = source_signature(file_path) if file_path.exists() else None
+            state = self._metric_state.get(key)
+            if state is not None and state['signature'] == signature:
+                continue
+            changed = True
+            if signature is None:
+                self._metric_state.pop(key, None)
+                continue
+            try:
+                # Files that were rewritten rather than appended to start their running totals over
+                appended = (state is not None and signature['size'] >= state['signature']['size']
+                            and head_fingerprint(file_path, state['signature']['size']) == state['fingerprint'])
+                summary = self._metric_summary(device_path, metric, filename, appended)
+                fingerprint = head_fingerprint(file_path, signature['size'])
+            except Exception as e:
+                print(f"WARNING: Could not summarize {metric} of {device_id}: {e}")
+                # Remembered with this signature, so the file is not read again until it changes
+                self._metric_state[key] = {'signature': signature, 'fingerprint': None, 'summary': None}
+                continue
+            self._metric_state[key] = {'signature': signature, 'fingerprint': fingerprint, 'summary': summary}
+        return changed
+
+    def _device_summary(self, device_id: str) -> dict:
+        metrics = {metric: state['summary'] for (device, metric), state in self._metric_state.items()
+                   if device == device_id and state['summary'] is not None}
+        latest = [summary['latest_at'] for summary in metrics.values() if summary['latest_at']]
+        totals = self._throughput.get(device_id)
+        throughput = None
+        if totals is not None and THROUGHPUT_METRIC in metrics:
+            throughput = {
+                'charge_ah': round(totals['charge'] + totals.get('open_charge', 0.0), 3),
+                'discharge_ah': round(totals['discharge'] + totals.get('open_discharge', 0.0), 3),
+            }
+        alarms = {}
+        for metric in ALARM_METRICS:
+            if metric in metrics:
+                alarms[metric] = bool(metrics[metric]['latest'] or 0)
+                alarms[f"{metric}_today"] = bool(metrics[metric]['day_max'] or 0)
+        return {
+            'last_seen': max(latest) if latest else None,
+            'metrics': metrics,
+            'throughput': throughput,
+            'alarms': alarms,
+            'alarm_active': any(alarms.values()),
+        }
+
+    def summary(self, metric_files: Dict[str, str], force: bool = False) -> Dict[str, Any]:
+        """
+        Fleet summary, refreshed at most once per refresh period (or when forced);
+        `version` changes whenever any device summary changed.
+        """
+        with self._lock:
+            now = time.time()
+            if force or not self._summary or now - self._refreshed_at >= self.refresh_seconds:
+                device_paths = sorted(path for path in self.data_base_path.iterdir() if path.is_dir())
+                changed = False
+                for device_path in device_paths:
+                    changed |= self._refresh_device(device_path, metric_files)
+                known = {path.name for path in device_paths}
+                if changed or set(self._summary.get('devices', {})) != known:
+                    self.version += 1
+                    self._summary = {'devices': {device_id: self._device_summary(device_id)
+                                                 for device_id in sorted(known)}}
+                self._refreshed_at = now
+            return {'version': self.version,
+                    'refreshed_at': pd.Timestamp(self._refreshed_at, unit='s').isoformat(),
+                    **self._summary}
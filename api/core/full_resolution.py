@@ -0,0 +1,218 @@
+"""
+BESS Full-Resolution Timeline
+=============================
+Unified timeline over a whole period without decimation or row caps. The period
+is split into fixed chunks that are aligned on demand: only the base metric's
+rows per chunk are counted up front, which gives an exact total and lets a page
+be located without building the chunks before it. Aligned chunks are kept in a
+least-recently-used store bounded by a memory budget.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from core.alignment import align_metric, to_epoch_ns
+from core.catalog import days_in_range
+from core.columnar_cache import read_metric_file
+from core.data_manager import compact_unified_frame
+from core.config import (
+    FULL_RESOLUTION_CHUNK_HOURS, FULL_RESOLUTION_MEMORY_BUDGET_MB, DEFAULT_ALIGNMENT_DIRECTION
+)
+
+
+class FullResolutionTimeline:
+    """
+    Pages through every base-metric row of a data manager's period.
+    The period comes from the manager's explicit range or target date, or from
+    the best overlapping period when neither is set.
+    """
+
+    def __init__(self, data_manager, chunk_hours: float = FULL_RESOLUTION_CHUNK_HOURS,
+                 memory_budget_mb: float = FULL_RESOLUTION_MEMORY_BUDGET_MB):
+        self.data_manager = data_manager
+        self.chunk_width = pd.Timedelta(hours=chunk_hours)
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+
+        self.start_time = None
+        self.end_time = None
+        self.base_metric = None
+        self.metrics: List[str] = []
+
+        self._chunk_starts: Optional[List[pd.Timestamp]] = None
+        self._offsets: Optional[np.ndarray] = None  # Rows before each chunk, plus the total
+        self._chunks: "OrderedDict[int, pd.DataFrame]" = OrderedDict()
+        self._chunk_bytes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Called after chunks were loaded or dropped, so a cache holding the owner can resize it
+        self.on_resize: Optional[Callable[[], None]] = None
+
+    def plan(self):
+        """Pick the period and base metric and count rows per chunk, once"""
+        with self._lock:
+            self._plan()
+
+    @property
+    def total(self) -> int:
+        """Exact number of rows in the full-resolution timeline"""
+        with self._lock:
+            self._plan()
+            return int(self._offsets[-1])
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the aligned chunks currently in memory"""
+        return sum(list(self._chunk_bytes.values()))
+
+    def _plan(self):
+        """Pick the period, base metric and chunk boundaries, and count rows per chunk"""
+        if self._offsets is not None:
+            return
+
+        manager = self.data_manager
+        start_time, end_time = manager.get_target_date_range()
+        if not (start_time and end_time):
+            start_time, end_time = manager.find_best_time_period()
+            # The best period ends at a sample; keep it in the half-open range
+            end_time = pd.Timestamp(end_time) + pd.Timedelta(1, unit='ns')
+        self.start_time, self.end_time = pd.Timestamp(start_time), pd.Timestamp(end_time)
+
+        catalog = manager.get_metric_catalog()
+        in_period = {metric: entry for metric, entry in catalog.items()
+                     if entry['row_count'] and days_in_range(entry, self.start_time, self.end_time)}
+        core_candidates = [metric for metric in manager.core_metrics if metric in in_period]
+        if not core_candidates:
+            raise ValueError("No data available for the selected time period")
+
+        # The most densely sampled core metric gives the base timeline
+        def sampling_interval(metric):
+            interval = in_period[metric]['median_interval_s']
+            return interval if interval is not None else float('inf')
+
+        self.base_metric = min(core_candidates, key=sampling_interval)
+        self.metrics = [self.base_metric] + [metric for metric in manager.get_metric_files()
+                                             if metric in in_period and metric != self.base_metric]
+
+        chunk_starts = list(pd.date_range(self.start_time, self.end_time, freq=self.chunk_width,
+                                          inclusive='left'))
+        base_entry = in_period[self.base_metric]
+        base_path = manager.device_path / manager.get_metric_files()[self.base_metric]
+
+        counts = []
+        for chunk_start in chunk_starts:
+            chunk_end = min(chunk_start + self.chunk_width, self.end_time)
+            if not days_in_range(base_entry, chunk_start, chunk_end):
+                counts.append(0)
+                continue
+            df = read_metric_file(base_path, start=chunk_start, end=chunk_end)
+            ts = df['ts'][(df['ts'] >= chunk_start) & (df['ts'] < chunk_end)]
+            counts.append(int(ts.nunique()))
+
+        self._chunk_starts = chunk_starts
+        self._offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        print(f"Full-resolution timeline for {manager.device_id}: {self._offsets[-1]} rows "
+              f"in {len(chunk_starts)} chunks, base {self.base_metric}")
+
+    def _build_chunk(self, chunk_id: int) -> pd.DataFrame:
+        """Align every metric onto the base rows of one chunk"""
+        manager = self.data_manager
+        metric_files = manager.get_metric_files()
+        chunk_start = self._chunk_starts[chunk_id]
+        chunk_end = min(chunk_start + self.chunk_width, self.end_time)
+
+        # Neighbouring samples within the tolerance still match rows at the chunk edges
+        load_start, load_end = chunk_start - manager.tolerance, chunk_end + manager.tolerance
+        pending = {metric: manager._submit_metric_load(manager.device_path / metric_files[metric],
+                                                       load_start, load_end, True, 0)
+                   for metric in self.metrics}
+
+        loaded = {}
+        for metric, future in pending.items():
+            try:
+                loaded[metric] = future.result()
+            except Exception as e:
+                print(f"ERROR loading {metric} for chunk {chunk_start}: {e}")
+
+        base_df = loaded.get(self.base_metric)
+        if base_df is None:
+            base_df = pd.DataFrame({'ts': pd.Series(dtype='datetime64[ns]')})
+        base_df = base_df[(base_df['ts'] >= chunk_start) & (base_df['ts'] < chunk_end)]
+
+        unified_df = pd.DataFrame({'timestamp': base_df['ts'].values})
+        base_ns = to_epoch_ns(unified_df['timestamp'])
+        for metric in self.metrics:
+            df = loaded.get(metric)
+            if df is None or df.empty:
+                unified_df[metric] = np.full(len(unified_df), np.nan, dtype=np.float32)
+                continue
+
+            value_col = [col for col in df.columns if col != 'ts'][0]
+            if metric == self.base_metric:
+                unified_df[metric] = base_df[value_col].values
+                continue
+
+            direction = manager.alignment_directions.get(metric, DEFAULT_ALIGNMENT_DIRECTION)
+            aligned_values, _ = align_metric(
+                base_ns, to_epoch_ns(df['ts']), df[value_col].values, manager.tolerance, direction
+            )
+            unified_df[metric] = aligned_values
+
+        return compact_unified_frame(unified_df, manager.flag_metrics)
+
+    def _get_chunk(self, chunk_id: int) -> pd.DataFrame:
+        chunk = self._chunks.get(chunk_id)
+        if chunk is not None:
+            self._chunks.move_to_end(chunk_id)
+            return chunk
+
+        chunk = self._build_chunk(chunk_id)
+        self._chunks[chunk_id] = chunk
+        self._chunk_bytes[chunk_id] = int(chunk.memory_usage(index=True, deep=True).sum())
+
+        # Drop least recently used chunks beyond the budget, always keeping the newest
+        while self.memory_bytes > self.memory_budget and len(self._chunks) > 1:
+            evicted, _ = self._chunks.popitem(last=False)
+            del self._chunk_bytes[evicted]
+        if self.on_resize is not None:
+            self.on_resize()
+        return chunk
+
+    def position_after(self, timestamp) -> int:
+        """Number of rows at or before a timestamp; only the chunk holding it is aligned"""
+        with self._lock:
+            self._plan()
+            timestamp = pd.Timestamp(timestamp)
+            if timestamp < self.start_time:
+                return 0
+            if timestamp >= self.end_time:
+                return int(self._offsets[-1])
+            chunk_id = int(np.searchsorted(np.array(self._chunk_starts, dtype='datetime64[ns]'),
+                                           timestamp.to_datetime64(), side='right')) - 1
+            chunk = self._get_chunk(chunk_id)
+            position = int(np.searchsorted(chunk['timestamp'].values, timestamp.to_datetime64(), side='right'))
+            return int(min(self._offsets[chunk_id] + position, self._offsets[chunk_id + 1]))
+
+    def get_rows(self, skip: int = 0, limit: int = 100) -> pd.DataFrame:
+        """Rows [skip, skip + limit) of the full-resolution timeline"""
+        with self._lock:
+            self._plan()
+            total = int(self._offsets[-1])
+            position, stop = skip, min(skip + limit, total)
+
+            parts = []
+            while position < stop:
+                chunk_id = int(np.searchsorted(self._offsets, position, side='right')) - 1
+                chunk = self._get_chunk(chunk_id)
+                lo = position - int(self._offsets[chunk_id])
+                hi = min(stop - int(self._offsets[chunk_id]), len(chunk))
+                if hi <= lo:
+                    # The source changed since the chunk was counted
+                    break
+                parts.append(chunk.iloc[lo:hi])
+                position += hi - lo
+
+            if not parts:
+                return pd.DataFrame(columns=['timestamp'] + self.metrics)
+            return pd.concat(parts, ignore_index=True)
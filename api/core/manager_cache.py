@@ -0,0 +1,227 @@
+"""
+BESS Manager Cache
+==================
+Bounded cache for data managers. Entries are sized from the frames they actually
+hold when inserted and again when their owner reports a change through `resize`
+(managers load lazily after being cached); a running total of those sizes is
+checked against the budget, so lookups never walk the frames. Entries are evicted
+least recently used first once the byte budget or entry limit is exceeded. Entries can expire after a TTL, and pinned entries are never
+evicted automatically. Concurrent builds of the same data are coalesced with
+SingleFlight so that a burst of identical requests does the work once.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls per key: the first caller runs the function, callers
+    arriving while it runs wait for and share its result (or exception). Nothing is
+    remembered afterwards, so a failed call is retried by the next request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+def _manager_bytes(manager) -> int:
+    return int(manager.memory_usage()['bytes'])
+
+
+class ManagerCache:
+    """LRU cache with a byte budget, optional TTL, pinning and hit/miss/eviction counters"""
+
+    def __init__(self, max_bytes: int, max_entries: int = None, ttl_seconds: float = None,
+                 sizer: Callable[[Any], int] = _manager_bytes):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sizer = sizer
+
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._bytes = 0  # Sum of the entries' last measured sizes
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return (bool(self.ttl_seconds) and not entry['pinned']
+                and now - entry['created_at'] > self.ttl_seconds)
+
+    def _measure(self, entry: dict):
+        try:
+            size = self.sizer(entry['value'])
+        except Exception as e:
+            print(f"WARNING: Could not size cache entry: {e}")
+            return
+        self._bytes += size - entry['bytes']
+        entry['bytes'] = size
+
+    def _remove(self, key: str) -> dict:
+        entry = self._entries.pop(key)
+        self._bytes -= entry['bytes']
+        return entry
+
+    def _expire(self, now: float):
+        for key in [key for key, entry in self._entries.items() if self._expired(entry, now)]:
+            self._remove(key)
+            self.expirations += 1
+
+    def _enforce_limits(self, keep: str = None):
+        """Evict unpinned entries, least recently used first, until within limits"""
+        for key in list(self._entries):
+            over_bytes = self.max_bytes is not None and self._bytes > self.max_bytes
+            over_entries = self.max_entries is not None and len(self._entries) > self.max_entries
+            if not (over_bytes or over_entries):
+                break
+            if self._entries[key]['pinned'] or key == keep:
+                continue
+            entry = self._remove(key)
+            self.evictions += 1
+            print(f"Evicted cached manager {key} ({entry['bytes']} bytes)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for a key, or None when missing or expired"""
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            entry['last_access'] = now
+            entry['hits'] += 1
+            self._entries.move_to_end(key)
+            return entry['value']
+
+    def put(self, key: str, value: Any, pinned: bool = False):
+        """Insert or replace a value and evict whatever no longer fits"""
+        with self._lock:
+            now = time.time()
+            if key in self._entries:
+                self._remove(key)
+            entry = self._entries[key] = {'value': value, 'created_at': now, 'last_access': now,
+                                          'hits': 0, 'bytes': 0, 'pinned': pinned}
+            self._measure(entry)
+            self._expire(now)
+            self._enforce_limits(keep=key)
+
+    def resize(self, key: str):
+        """Measure an entry again after its value grew or shrank, evicting others if needed"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._measure(entry)
+                self._enforce_limits(keep=key)
+
+    def get_or_create(self, key: str, factory: Callable[[], Any], pinned: bool = False) -> Any:
+        """Cached value for a key, creating and inserting it on a miss"""
+        with self._lock:
+            value = self.get(key)
+            if value is None:
+                value = factory()
+                self.put(key, value, pinned)
+            return value
+
+    def pin(self, key: str, pinned: bool = True) -> bool:
+        """Pin or unpin an entry; returns False when the key is not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry['pinned'] = pinned
+            return True
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._remove(key)['value'] if key in self._entries else None
+
+    def clear(self, include_pinned: bool = False) -> int:
+        """Drop all (unpinned) entries; returns how many were removed"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if include_pinned or not entry['pinned']]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def values(self) -> List[Any]:
+        """Live values, most recently used last; does not count as access"""
+        with self._lock:
+            self._expire(time.time())
+            return [entry['value'] for entry in self._entries.values()]
+
+    def items(self) -> List[tuple]:
+        with self._lock:
+            self._expire(time.time())
+            return [(key, entry['value']) for key, entry in self._entries.items()]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry, time.time())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """Sum of the entries' measured sizes"""
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters, limits and per-entry details (LRU order, least recent first)"""
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'items': [{
+                    'key': key,
+                    'bytes': entry['bytes'],
+                    'pinned': entry['pinned'],
+                    'hits': entry['hits'],
+                    'age_seconds': round(now - entry['created_at'], 1),
+                    'idle_seconds': round(now - entry['last_access'], 1),
+                } for key, entry in self._entries.items()],
+            }
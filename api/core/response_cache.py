@@ -0,0 +1,160 @@
+"""
+BESS Response Cache
+===================
+Encoded response bodies keyed by a strong entity tag derived from the dataset
+version and the request (range, page, format). Bodies are compressed once per
+content coding (gzip, and brotli when installed) and kept in a least recently
+used store bounded by bytes, so repeated dashboard loads are served without
+re-encoding, and revalidations are answered with 304 before any work is done.
+"""
+
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Responses fall back to gzip without brotli
+    brotli = None
+
+from core.config import RESPONSE_CACHE_MAX_MB, RESPONSE_COMPRESS_MIN_BYTES
+
+CONTENT_CODINGS = ("br", "gzip", "identity")
+
+
+def make_etag(version: str, *parts) -> str:
+    """Opaque tag for one representation of one dataset version"""
+    payload = json.dumps([version, *parts], default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def entity_tag(etag: str, encoding: str) -> str:
+    """Quoted ETag header value; each content coding is its own strong validator"""
+    return f'"{etag}"' if encoding == "identity" else f'"{etag}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names any coding of this representation"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == etag or candidate.rsplit('-', 1)[0] == etag:
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Preferred content coding the client accepts: brotli, then gzip, else identity"""
+    if not accept_encoding:
+        return "identity"
+    accepted = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    for coding in CONTENT_CODINGS[:-1]:
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return "identity"
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+class ResponseCache:
+    """LRU of encoded bodies per entity tag and content coding, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+                 min_compress_bytes: int = RESPONSE_COMPRESS_MIN_BYTES):
+        self.max_bytes = max_bytes
+        self.min_compress_bytes = min_compress_bytes
+        self._entries: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, bodies = self._entries.popitem(last=False)
+            self._bytes -= sum(len(body) for body in bodies.values())
+            self.evictions += 1
+
+    def get_body(self, etag: str, encoding: str, render: Callable[[], bytes]) -> Tuple[bytes, str]:
+        """
+        Body of a representation in the requested coding, rendering and compressing
+        only what is not cached yet. Small bodies are sent uncompressed; the coding
+        actually used is returned with the body.
+        """
+        with self._lock:
+            bodies = self._entries.get(etag)
+            if bodies is not None:
+                self._entries.move_to_end(etag)
+                identity = bodies["identity"]
+                if len(identity) < self.min_compress_bytes:
+                    encoding = "identity"
+                if encoding in bodies:
+                    self.hits += 1
+                    return bodies[encoding], encoding
+            else:
+                self.misses += 1
+
+        if bodies is None:
+            identity = render()
+        if len(identity) < self.min_compress_bytes:
+            encoding = "identity"
+        body = _compress(identity, encoding)
+
+        with self._lock:
+            bodies = self._entries.get(etag)
+            if bodies is None:
+                bodies = self._entries[etag] = {"identity": identity}
+                self._bytes += len(identity)
+            if encoding not in bodies:
+                bodies[encoding] = body
+                self._bytes += len(body)
+            self._entries.move_to_end(etag)
+            self._evict()
+        return body, encoding
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'brotli_available': brotli is not None,
+            }
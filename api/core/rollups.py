@@ -0,0 +1,275 @@
+"""
+BESS Rollup Pyramid
+===================
+Precomputed min/max/mean/last/count buckets per metric file at 1-minute,
+15-minute, hourly and daily resolution. Pyramids are persisted in the cache
+directory, extended incrementally when a file grows by appending, and queried
+at the coarsest resolution that still gives the requested number of points,
+so month and year views cost the same regardless of the raw sample rate.
+Recently used pyramids are kept in memory within a byte budget.
+"""
+
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Pyramids stay in memory only without pyarrow
+    feather = None
+
+from core.config import COLUMNAR_CACHE_PATH, ROLLUPS_PERSIST, ROLLUP_MEMORY_BUDGET_MB
+from core.columnar_cache import read_metric_file, source_signature
+from core.time_index import head_fingerprint
+
+ROLLUP_VERSION = 2
+ROLLUP_DIRNAME = "rollups"
+
+# Finest to coarsest; every width divides a day so day boundaries align across levels
+ROLLUP_LEVELS = {
+    "1min": 60,
+    "15min": 15 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+ROLLUP_COLUMNS = ["bucket", "min", "max", "mean", "last", "count"]
+
+# Pyramids in memory, least recently used first; evicted ones are reloaded from their Feather levels
+_pyramids: "OrderedDict[Path, dict]" = OrderedDict()
+_pyramid_bytes: Dict[Path, int] = {}
+_memo_lock = threading.Lock()
+# A fixed set of locks striped by file keeps per-file builds exclusive without growing per file
+_pyramid_locks = [threading.Lock() for _ in range(64)]
+
+
+def _rollup_dir(file_path: Path) -> Path:
+    return COLUMNAR_CACHE_PATH / file_path.parent.name / ROLLUP_DIRNAME
+
+
+def _level_path(file_path: Path, level: str) -> Path:
+    return _rollup_dir(file_path) / f"{file_path.stem}.{level}.feather"
+
+
+def _state_path(file_path: Path) -> Path:
+    return _rollup_dir(file_path) / f"{file_path.stem}.rollup.json"
+
+
+def group_raw(df: pd.DataFrame, width_s: int):
+    """
+    Group raw ts/value rows into buckets of `width_s` seconds starting on multiples
+    of the width since the epoch. Rows are taken in time order whatever the file
+    order, so "last" is the latest reading of each bucket.
+    """
+    if not df['ts'].is_monotonic_increasing:
+        df = df.sort_values('ts', kind='stable')
+    value_col = [col for col in df.columns if col != 'ts'][0]
+    width_ns = width_s * 1_000_000_000
+    ts_ns = df['ts'].values.astype('datetime64[ns]').view('int64')
+    frame = pd.DataFrame({'bucket': ts_ns // width_ns * width_ns,
+                          'value': df[value_col].to_numpy(dtype=np.float64)})
+    return frame.groupby('bucket', sort=True)['value']
+
+
+def _aggregate_raw(df: pd.DataFrame, width_s: int) -> pd.DataFrame:
+    """Bucket raw ts/value rows; NaN values count as missing"""
+    result = group_raw(df, width_s).agg(['min', 'max', 'mean', 'last', 'count']).reset_index()
+    return result[ROLLUP_COLUMNS]
+
+
+def _aggregate_level(finer: pd.DataFrame, width_s: int) -> pd.DataFrame:
+    """Derive a coarser level from a finer one without touching raw data"""
+    width_ns = width_s * 1_000_000_000
+    frame = finer.assign(bucket=finer['bucket'] // width_ns * width_ns,
+                         total=finer['mean'].fillna(0) * finer['count'])
+    grouped = frame.groupby('bucket', sort=True)
+    result = grouped.agg(min=('min', 'min'), max=('max', 'max'), last=('last', 'last'),
+                         count=('count', 'sum'), total=('total', 'sum')).reset_index()
+    counts = result['count'].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['mean'] = np.where(counts > 0, result['total'].to_numpy() / counts, np.nan)
+    return result[ROLLUP_COLUMNS]
+
+
+def build_levels(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Build every pyramid level from raw rows: the finest from raw, the rest from the level below"""
+    levels = {}
+    finer = None
+    for level, width_s in ROLLUP_LEVELS.items():
+        finer = _aggregate_raw(df, width_s) if finer is None else _aggregate_level(finer, width_s)
+        levels[level] = finer
+    return levels
+
+
+def _save_pyramid(file_path: Path, pyramid: dict):
+    if not ROLLUPS_PERSIST or feather is None:
+        return
+    target_dir = _rollup_dir(file_path)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    for level, frame in pyramid['levels'].items():
+        target = _level_path(file_path, level)
+        tmp_path = target.with_name(target.name + suffix)
+        feather.write_feather(frame.reset_index(drop=True), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, target)
+    state_target = _state_path(file_path)
+    tmp_path = state_target.with_name(state_target.name + suffix)
+    with open(tmp_path, 'w') as f:
+        json.dump(pyramid['state'], f)
+    os.replace(tmp_path, state_target)
+
+
+def _load_pyramid(file_path: Path) -> Optional[dict]:
+    if not ROLLUPS_PERSIST or feather is None or not _state_path(file_path).exists():
+        return None
+    try:
+        with open(_state_path(file_path)) as f:
+            state = json.load(f)
+        if state.get('version') != ROLLUP_VERSION:
+            return None
+        levels = {level: feather.read_feather(_level_path(file_path, level)) for level in ROLLUP_LEVELS}
+        return {'state': state, 'levels': levels}
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable rollups for {file_path}: {e}")
+        return None
+
+
+def _build_pyramid(file_path: Path) -> dict:
+    signature = source_signature(file_path)
+    levels = build_levels(read_metric_file(file_path))
+    return {'state': _make_state(file_path, signature), 'levels': levels}
+
+
+def _make_state(file_path: Path, signature: Dict[str, int]) -> dict:
+    return {
+        'version': ROLLUP_VERSION,
+        'source_mtime_ns': signature['mtime_ns'],
+        'source_size': signature['size'],
+        'fingerprint': head_fingerprint(file_path, signature['size']),
+    }
+
+
+def _extend_pyramid(file_path: Path, pyramid: dict) -> dict:
+    """
+    Recompute only the last day onwards after an append. Everything before the
+    start of the last daily bucket is unchanged for append-only files.
+    """
+    signature = source_signature(file_path)
+    daily = pyramid['levels']['1d']
+    if daily.empty:
+        return _build_pyramid(file_path)
+
+    tail_start_ns = int(daily['bucket'].iloc[-1])
+    tail = read_metric_file(file_path, start=pd.Timestamp(tail_start_ns), end=pd.Timestamp.max)
+    tail = tail[tail['ts'].values.astype('datetime64[ns]').view('int64') >= tail_start_ns]
+    tail_levels = build_levels(tail)
+
+    levels = {}
+    for level, frame in pyramid['levels'].items():
+        kept = frame[frame['bucket'] < tail_start_ns]
+        levels[level] = pd.concat([kept, tail_levels[level]], ignore_index=True)
+    return {'state': _make_state(file_path, signature), 'levels': levels}
+
+
+def _remember(file_path: Path, pyramid: dict):
+    """Keep a pyramid in memory as the most recently used, evicting beyond the memory budget"""
+    budget = int(ROLLUP_MEMORY_BUDGET_MB * 1024 * 1024)
+    with _memo_lock:
+        if file_path not in _pyramids or _pyramids[file_path] is not pyramid:
+            _pyramids[file_path] = pyramid
+            _pyramid_bytes[file_path] = sum(int(frame.memory_usage(index=True).sum())
+                                            for frame in pyramid['levels'].values())
+        _pyramids.move_to_end(file_path)
+        # The newest pyramid stays even when it alone exceeds the budget
+        while sum(_pyramid_bytes.values()) > budget and len(_pyramids) > 1:
+            evicted, _ = _pyramids.popitem(last=False)
+            del _pyramid_bytes[evicted]
+
+
+def get_pyramid(file_path: Path) -> Dict[str, pd.DataFrame]:
+    """
+    Return the up-to-date rollup levels of a metric file, building them on first
+    use and extending them incrementally when the file has grown by appending.
+    """
+    with _pyramid_locks[hash(file_path) % len(_pyramid_locks)]:
+        signature = source_signature(file_path)
+        with _memo_lock:
+            pyramid = _pyramids.get(file_path)
+        pyramid = pyramid or _load_pyramid(file_path)
+
+        if pyramid is not None:
+            state = pyramid['state']
+            if state['source_mtime_ns'] == signature['mtime_ns'] and state['source_size'] == signature['size']:
+                _remember(file_path, pyramid)
+                return pyramid['levels']
+
+        # Appends keep the start of the file intact; anything else is rebuilt from scratch
+        appended = (pyramid is not None and signature['size'] > pyramid['state']['source_size']
+                    and head_fingerprint(file_path, pyramid['state']['source_size']) == pyramid['state']['fingerprint'])
+        pyramid = _extend_pyramid(file_path, pyramid) if appended else _build_pyramid(file_path)
+
+        _save_pyramid(file_path, pyramid)
+        _remember(file_path, pyramid)
+        return pyramid['levels']
+
+
+def choose_level(start: datetime, end: datetime, points: int) -> str:
+    """Coarsest level whose bucket count over [start, end) still reaches `points`"""
+    span_s = max((pd.Timestamp(end) - pd.Timestamp(start)).total_seconds(), 0)
+    chosen = next(iter(ROLLUP_LEVELS))
+    for level, width_s in ROLLUP_LEVELS.items():
+        if span_s / width_s >= points:
+            chosen = level
+    return chosen
+
+
+def query_rollups(file_path: Path, start: datetime = None, end: datetime = None, points: int = 500,
+                  level: str = None) -> Tuple[str, pd.DataFrame]:
+    """
+    Buckets of one metric file over [start, end) at the given level, or at the
+    coarsest level that still meets the requested point density.
+    """
+    levels = get_pyramid(file_path)
+    finest = levels[next(iter(ROLLUP_LEVELS))]
+
+    if start is None:
+        start = pd.Timestamp(int(finest['bucket'].iloc[0])) if len(finest) else pd.Timestamp(0)
+    if end is None:
+        end = pd.Timestamp(int(finest['bucket'].iloc[-1]) + 1) if len(finest) else pd.Timestamp(0)
+
+    if level is None:
+        level = choose_level(start, end, points)
+    elif level not in ROLLUP_LEVELS:
+        raise ValueError(f"Invalid rollup level: {level}. Use one of {list(ROLLUP_LEVELS)}")
+
+    frame = levels[level]
+    width_ns = ROLLUP_LEVELS[level] * 1_000_000_000
+    buckets = frame['bucket'].to_numpy()
+    # Include the bucket that contains `start`
+    lo = np.searchsorted(buckets, pd.Timestamp(start).value // width_ns * width_ns, side='left')
+    hi = np.searchsorted(buckets, pd.Timestamp(end).value, side='left')
+    return level, frame.iloc[lo:hi]
+
+
+def rollup_buckets(file_path: Path, width_s: int, start: datetime = None,
+                   end: datetime = None) -> Optional[pd.DataFrame]:
+    """
+    min/max/mean/last/count buckets of any width that is a multiple of a pyramid
+    level, regrouped from the coarsest such level. None when the width or an
+    unaligned start/end cannot be answered exactly from the pyramid.
+    """
+    usable = [level for level, level_s in ROLLUP_LEVELS.items() if width_s % level_s == 0
+              and all(bound is None or pd.Timestamp(bound).value % (level_s * 1_000_000_000) == 0
+                      for bound in (start, end))]
+    if not usable:
+        return None
+    level = usable[-1]
+    _, frame = query_rollups(file_path, start, end, level=level)
+    if width_s == ROLLUP_LEVELS[level]:
+        return frame.reset_index(drop=True)
+    return _aggregate_level(frame, width_s)
@@ -0,0 +1,304 @@
+"""
+BESS Response Serialization
+===========================
+Column-wise JSON encoding of unified frame slices. Values are checked against the
+numeric bounds of the response schema once, when a dataset is built; rows that
+would fail validation are reduced to their timestamp, as the validated path does.
+Pages are then encoded straight to bytes without building a Pydantic model per
+row (unified datasets keep their rows pre-encoded, so a page is a string join).
+Missing readings are left out of a record instead of being sent as null.
+
+Pages can be addressed by cursors: opaque tokens holding the timestamp of the
+last row a client received, so they stay valid across rebuilds and new data.
+
+Bulk clients can negotiate column-oriented formats instead, encoded from the
+frame's arrays without a Python object per value: columnar JSON (one array per
+metric, formatted and joined by Arrow compute kernels), Arrow IPC and MessagePack
+(one binary buffer per column).
+"""
+
+import json
+import base64
+import binascii
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Arrow responses are unavailable without pyarrow
+    pa = None
+    pc = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are unavailable without msgpack
+    msgpack = None
+
+# Response formats by media type; "json" is the row-oriented BESSResponse layout
+RESPONSE_FORMATS = {
+    "application/json": "json",
+    "application/vnd.bess.columnar+json": "columnar",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+}
+FORMAT_MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.bess.columnar+json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/msgpack",
+}
+
+_bounds_cache: Dict[type, Dict[str, Tuple[Optional[float], Optional[float]]]] = {}
+
+
+def field_bounds(model: Type[BaseModel]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """(ge, le) bounds of every constrained field of a Pydantic model"""
+    bounds = _bounds_cache.get(model)
+    if bounds is None:
+        bounds = {}
+        for name, field in model.model_fields.items():
+            lower = upper = None
+            for constraint in field.metadata:
+                lower = getattr(constraint, 'ge', lower)
+                upper = getattr(constraint, 'le', upper)
+            if lower is not None or upper is not None:
+                bounds[name] = (lower, upper)
+        _bounds_cache[model] = bounds
+    return bounds
+
+
+def valid_rows(df: pd.DataFrame, model: Type[BaseModel]) -> np.ndarray:
+    """Rows whose present values all satisfy the model's bounds"""
+    valid = np.ones(len(df), dtype=bool)
+    for col, (lower, upper) in field_bounds(model).items():
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            if lower is not None:
+                valid &= ~(values < lower)
+            if upper is not None:
+                valid &= ~(values > upper)
+    return valid
+
+
+def _timestamp_array(timestamps: pd.Series) -> np.ndarray:
+    """ISO timestamps as Pydantic writes them: microseconds only when non-zero"""
+    text = np.datetime_as_string(timestamps.to_numpy().astype('datetime64[us]'), unit='us')
+    return np.char.replace(text, '.000000', '')
+
+
+def _timestamp_text(timestamps: pd.Series) -> list:
+    return _timestamp_array(timestamps).tolist()
+
+
+def _value_fragments(name: str, series: pd.Series) -> list:
+    """',"name":value' per row, or '' where the value is missing"""
+    key = ',' + json.dumps(name) + ':'
+    if pd.api.types.is_bool_dtype(series.dtype):
+        present = series.notna().to_numpy().tolist()
+        values = series.fillna(False).to_numpy(dtype=bool).tolist()
+        return [(key + ('true' if value else 'false')) if ok else '' for value, ok in zip(values, present)]
+
+    # float32 columns print their shortest repr (3.3, not 3.2999999523)
+    values = series.to_numpy()
+    if values.dtype not in (np.float32, np.float64):
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+    present = np.isfinite(values).tolist()
+    return [key + text if ok else '' for text, ok in zip(values.astype(str).tolist(), present)]
+
+
+def encode_rows(df: pd.DataFrame, model: Type[BaseModel], row_valid: np.ndarray = None) -> list:
+    """
+    Encode every row of a unified frame as a JSON object string. Only model fields
+    are written; rows flagged invalid keep just their timestamp.
+    """
+    if df.empty:
+        return []
+
+    columns = [['{"timestamp":"' + text + '"' for text in _timestamp_text(df['timestamp'])]]
+    invalid = None if row_valid is None or row_valid.all() else (~row_valid).tolist()
+    for col in df.columns:
+        if col == 'timestamp' or col not in model.model_fields:
+            continue
+        fragments = _value_fragments(col, df[col])
+        if invalid is not None:
+            fragments = ['' if bad else fragment for fragment, bad in zip(fragments, invalid)]
+        columns.append(fragments)
+    columns.append(['}'] * len(df))
+    return [''.join(parts) for parts in zip(*columns)]
+
+
+def join_rows(rows: list) -> bytes:
+    """JSON array bytes from encoded rows"""
+    return ('[' + ','.join(rows) + ']').encode('utf-8')
+
+
+def encode_response(fields: dict, records: bytes) -> bytes:
+    """Wrap pre-encoded records in a response object: the given fields, then "data" """
+    head = json.dumps(fields, separators=(',', ':'))[:-1]
+    return head.encode('utf-8') + b',"data":' + records + b'}'
+
+
+def encode_cursor(timestamp) -> str:
+    """Opaque page cursor anchored at the last timestamp a client has received"""
+    ns = int(pd.Timestamp(timestamp).value)
+    payload = json.dumps({"v": 1, "after": ns}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> np.datetime64:
+    """Timestamp a cursor is anchored at; raises ValueError for malformed cursors"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        after = payload["after"]
+        if payload.get("v") != 1 or not isinstance(after, int) or isinstance(after, bool):
+            raise ValueError
+        timestamp = np.datetime64(after, 'ns')
+        if np.isnat(timestamp):
+            raise ValueError
+        return timestamp
+    except (ValueError, KeyError, TypeError, AttributeError, OverflowError, binascii.Error):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def format_available(fmt: str) -> bool:
+    """Whether the optional dependency of a response format is installed"""
+    if fmt == "arrow":
+        return pa is not None
+    if fmt == "msgpack":
+        return msgpack is not None
+    return fmt in FORMAT_MEDIA_TYPES
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> Optional[str]:
+    """
+    Response format from an explicit `format` value or the Accept header (highest
+    q-value among supported media types wins). Returns None when nothing is acceptable.
+    """
+    if requested:
+        return requested if requested in FORMAT_MEDIA_TYPES else None
+    if not accept:
+        return "json"
+
+    best, best_q = None, -1.0
+    for position, item in enumerate(accept.split(',')):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        fmt = "json" if media_type in ("*/*", "application/*") else RESPONSE_FORMATS.get(media_type)
+        if fmt is not None and q > 0 and q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+def _metric_columns(df: pd.DataFrame, model: Type[BaseModel]) -> list:
+    return [col for col in df.columns if col != 'timestamp' and col in model.model_fields]
+
+
+def _masked(series: pd.Series, row_valid: np.ndarray = None) -> tuple:
+    """(values, present) of a metric column with invalid rows marked missing"""
+    if pd.api.types.is_bool_dtype(series.dtype):
+        present = series.notna().to_numpy()
+        values = series.fillna(False).to_numpy(dtype=bool)
+    else:
+        values = series.to_numpy()
+        if values.dtype not in (np.float32, np.float64):
+            values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+        present = np.isfinite(values)
+    if row_valid is not None:
+        present = present & row_valid
+    return values, present
+
+
+def _join(texts, separator: str) -> str:
+    """Join an array of strings into one string"""
+    if pc is None:
+        return separator.join(np.asarray(texts).tolist())
+    texts = pa.array(texts, type=pa.string())
+    offsets = pa.array([0, len(texts)], type=pa.int32())
+    return pc.binary_join(pa.ListArray.from_arrays(offsets, texts), separator)[0].as_py()
+
+
+def _json_array_body(values: np.ndarray, present: np.ndarray) -> str:
+    """Comma-separated JSON values with null where missing; float32 values keep their shortest repr"""
+    if pc is None:
+        texts = np.where(values, 'true', 'false') if values.dtype == bool else values.astype(str)
+        return _join(np.where(present, texts, 'null'), ',')
+    texts = pc.cast(pa.array(values, mask=~present), pa.string())
+    return _join(pc.fill_null(texts, 'null'), ',')
+
+
+def encode_columnar_json(fields: dict, df: pd.DataFrame, model: Type[BaseModel],
+                         row_valid: np.ndarray = None) -> bytes:
+    """
+    {...fields, "timestamps": [...], "metrics": {name: [...]}} with null for missing
+    values; every metric array lines up with the timestamps.
+    """
+    head = json.dumps(fields, separators=(',', ':'))[:-1]
+    timestamps = '"' + _join(_timestamp_array(df['timestamp']), '","') + '"' if len(df) else ''
+    metrics = []
+    for col in _metric_columns(df, model):
+        values, present = _masked(df[col], row_valid)
+        metrics.append(json.dumps(col) + ':[' + _json_array_body(values, present) + ']')
+    return (head + ',"timestamps":[' + timestamps + '],"metrics":{' + ','.join(metrics) + '}}').encode('utf-8')
+
+
+def encode_arrow(fields: dict, df: pd.DataFrame, model: Type[BaseModel],
+                 row_valid: np.ndarray = None) -> bytes:
+    """
+    Arrow IPC stream: a timestamp[ns] column plus one float32/bool column per
+    metric, nulls for missing values, response fields in the schema metadata.
+    """
+    columns = {'timestamp': pa.array(df['timestamp'].to_numpy().astype('datetime64[ns]'))}
+    for col in _metric_columns(df, model):
+        values, present = _masked(df[col], row_valid)
+        columns[col] = pa.array(values, mask=~present)
+    table = pa.table(columns).replace_schema_metadata(
+        {key: json.dumps(value) for key, value in fields.items()}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_msgpack(fields: dict, df: pd.DataFrame, model: Type[BaseModel],
+                   row_valid: np.ndarray = None) -> bytes:
+    """
+    The columnar layout as MessagePack with one binary buffer per column:
+    "timestamps" holds little-endian int64 epoch milliseconds and every metric is
+    {"type": "float32" or "bool", "values": little-endian float32 or one byte per
+    value, "valid": validity bitmap, least significant bit first}. "length" is the
+    row count.
+    """
+    ts_ns = df['timestamp'].to_numpy().astype('datetime64[ns]').view('int64')
+    metrics = {}
+    for col in _metric_columns(df, model):
+        values, present = _masked(df[col], row_valid)
+        if values.dtype == bool:
+            column = {'type': 'bool', 'values': (values & present).astype('u1').tobytes()}
+        else:
+            column = {'type': 'float32', 'values': np.where(present, values, np.nan).astype('<f4').tobytes()}
+        column['valid'] = np.packbits(present, bitorder='little').tobytes()
+        metrics[col] = column
+    payload = {**fields, 'length': len(df), 'timestamps': (ts_ns // 1_000_000).astype('<i8').tobytes(),
+               'metrics': metrics}
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+COLUMN_ENCODERS = {
+    "columnar": encode_columnar_json,
+    "arrow": encode_arrow,
+    "msgpack": encode_msgpack,
+}
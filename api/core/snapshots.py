@@ -0,0 +1,124 @@
+"""
+BESS Unified Snapshots
+======================
+Finished unified datasets persisted as uncompressed Feather files, so a restarted
+worker memory-maps them instead of reloading and re-aligning every metric. Only
+canonical periods are snapshotted (a device's auto period, a day or a month), so
+arbitrary ranges do not pile up files. A snapshot is keyed by device, period and
+a hash of the settings that shape it (metric map, alignment, downsampling, record
+cap), and records the modification time and size of every contributing source
+file; any change invalidates it. Stale snapshots are deleted when rejected, and
+writing one replaces the period's snapshots built with other settings.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Snapshots are disabled without pyarrow
+    pa = None
+    feather = None
+
+from core.config import UNIFIED_SNAPSHOTS_ENABLED, COLUMNAR_CACHE_PATH
+from core.columnar_cache import source_signature
+
+SNAPSHOT_VERSION = 4
+SNAPSHOT_DIRNAME = "snapshots"
+
+
+def snapshots_available() -> bool:
+    """Whether unified snapshots can be used in this environment"""
+    return UNIFIED_SNAPSHOTS_ENABLED and feather is not None
+
+
+def settings_hash(settings: dict) -> str:
+    """Stable hash of the settings a unified dataset was built with"""
+    payload = json.dumps({'version': SNAPSHOT_VERSION, **settings}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def snapshot_path_for(device_id: str, target_date: str = None, settings_key: str = "") -> Path:
+    """<cache>/<device_id>/snapshots/<period>-<settings hash>.feather; the period is a date or 'auto'"""
+    return COLUMNAR_CACHE_PATH / device_id / SNAPSHOT_DIRNAME / f"{target_date or 'auto'}-{settings_key}.feather"
+
+
+def _period_label(target: Path) -> str:
+    return target.stem.rsplit('-', 1)[0]
+
+
+def _discard(target: Path):
+    try:
+        target.unlink()
+    except OSError:
+        pass
+
+
+def source_signatures(device_path: Path, filenames: Iterable[str]) -> Dict[str, Optional[list]]:
+    """[mtime_ns, size] per source file, None for files that do not exist"""
+    signatures = {}
+    for filename in sorted(filenames):
+        file_path = device_path / filename
+        if file_path.exists():
+            signature = source_signature(file_path)
+            signatures[filename] = [signature['mtime_ns'], signature['size']]
+        else:
+            signatures[filename] = None
+    return signatures
+
+
+def write_snapshot(target: Path, unified_df: pd.DataFrame, sources: Dict[str, Optional[list]],
+                   info: dict) -> Optional[Path]:
+    """
+    Persist a unified frame with its source signatures (taken before the sources
+    were read) and any JSON-serializable info such as data quality.
+    """
+    if not snapshots_available():
+        return None
+
+    table = pa.Table.from_pandas(unified_df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        'snapshot_version': str(SNAPSHOT_VERSION),
+        'sources': json.dumps(sources),
+        'info': json.dumps(info, default=str),
+    })
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, target)
+    # One snapshot per period: those built with other settings are superseded
+    for sibling in target.parent.glob(f"{_period_label(target)}-*.feather"):
+        if sibling != target:
+            _discard(sibling)
+    return target
+
+
+def read_snapshot(target: Path, sources: Dict[str, Optional[list]]) -> Optional[tuple]:
+    """
+    (unified frame, info) from a snapshot written from exactly these source
+    signatures, or None when it is missing, stale or unreadable. Stale and
+    unreadable snapshots are deleted.
+    """
+    if not snapshots_available() or not target.exists():
+        return None
+    try:
+        table = feather.read_table(target, memory_map=True)
+        metadata = table.schema.metadata or {}
+        if (int(metadata.get(b'snapshot_version', -1)) != SNAPSHOT_VERSION
+                or json.loads(metadata[b'sources']) != sources):
+            del table
+            _discard(target)
+            return None
+        # Flags come back as nullable booleans, matching compact_unified_frame
+        df = table.to_pandas(types_mapper={pa.bool_(): pd.BooleanDtype()}.get)
+        return df, json.loads(metadata[b'info'])
+    except Exception as e:
+        print(f"WARNING: Discarding unreadable snapshot {target}: {e}")
+        _discard(target)
+        return None
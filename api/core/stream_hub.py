@@ -0,0 +1,137 @@
+"""
+BESS Stream Hub
+===============
+Server-Sent Events fan-out. Each stream key (device, date, interval) has one
+producer task that renders every event once and pushes the encoded frame to
+all subscribers through bounded per-client queues. A client that falls behind
+either has its oldest pending frames replaced by newer ones ("coalesce") or is
+disconnected ("drop"), so one slow dashboard never holds back the others.
+Idle subscribers receive a comment frame every heartbeat period.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from core.config import STREAM_CLIENT_QUEUE_SIZE, STREAM_SLOW_CLIENT_POLICY, STREAM_HEARTBEAT_SECONDS
+
+SLOW_CLIENT_POLICIES = ("coalesce", "drop")
+HEARTBEAT_FRAME = ": heartbeat\n\n"
+
+
+class _Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+        self.coalesced = 0
+
+
+class _Channel:
+    def __init__(self, source, interval: float):
+        self.source = source
+        self.interval = interval
+        self.subscribers = set()
+        self.task: Optional[asyncio.Task] = None
+        self.events = 0
+
+
+class StreamHub:
+    """
+    Broadcasts events from one source per key to any number of subscribers.
+    A source is any object with an async `next_event()` returning an encoded
+    SSE frame, or None when there is nothing to send on this tick.
+    """
+
+    def __init__(self, queue_size: int = STREAM_CLIENT_QUEUE_SIZE,
+                 slow_client_policy: str = STREAM_SLOW_CLIENT_POLICY,
+                 heartbeat_seconds: float = STREAM_HEARTBEAT_SECONDS):
+        if slow_client_policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Invalid slow client policy: {slow_client_policy}. Use one of {SLOW_CLIENT_POLICIES}")
+        self.queue_size = queue_size
+        self.slow_client_policy = slow_client_policy
+        self.heartbeat_seconds = heartbeat_seconds
+        self._channels: Dict[Hashable, _Channel] = {}
+        self.dropped_clients = 0
+        self.coalesced_frames = 0
+
+    def _publish(self, channel: _Channel, frame: str):
+        channel.events += 1
+        for subscriber in list(channel.subscribers):
+            if subscriber.dropped:
+                continue
+            if subscriber.queue.full():
+                if self.slow_client_policy == "drop":
+                    # Empty the queue so the disconnect marker always fits
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.dropped = True
+                    subscriber.queue.put_nowait(None)
+                    self.dropped_clients += 1
+                    continue
+                # Coalesce: the client skips ahead, losing its oldest pending frame
+                subscriber.queue.get_nowait()
+                subscriber.coalesced += 1
+                self.coalesced_frames += 1
+            subscriber.queue.put_nowait(frame)
+
+    async def _produce(self, key: Hashable, channel: _Channel):
+        while True:
+            # Checked and removed without awaiting in between, so a new subscriber
+            # either sees this channel running or starts a fresh one
+            if not channel.subscribers:
+                if self._channels.get(key) is channel:
+                    del self._channels[key]
+                return
+
+            try:
+                frame = await channel.source.next_event()
+            except Exception as e:
+                print(f"Stream producer error for {key}: {e}")
+                frame = None
+            if frame is not None:
+                self._publish(channel, frame)
+            await asyncio.sleep(channel.interval)
+
+    async def subscribe(self, key: Hashable, source_factory: Callable[[], Any], interval: float):
+        """
+        Async generator of encoded frames for one client. The first subscriber of a
+        key creates its source and producer; the last one to leave stops them.
+        """
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel(source_factory(), interval)
+
+        subscriber = _Subscriber(self.queue_size)
+        channel.subscribers.add(subscriber)
+        if channel.task is None or channel.task.done():
+            channel.task = asyncio.create_task(self._produce(key, channel))
+
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT_FRAME
+                    continue
+                if frame is None:
+                    print(f"Dropped slow stream client for {key}")
+                    return
+                yield frame
+        finally:
+            channel.subscribers.discard(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        """Channels with their subscriber counts, plus slow-client counters"""
+        return {
+            'channels': [{
+                'key': [str(part) for part in key] if isinstance(key, tuple) else str(key),
+                'subscribers': len(channel.subscribers),
+                'interval': channel.interval,
+                'events': channel.events,
+            } for key, channel in list(self._channels.items())],
+            'total_subscribers': sum(len(channel.subscribers) for channel in self._channels.values()),
+            'slow_client_policy': self.slow_client_policy,
+            'queue_size': self.queue_size,
+            'heartbeat_seconds': self.heartbeat_seconds,
+            'dropped_clients': self.dropped_clients,
+            'coalesced_frames': self.coalesced_frames,
+        }
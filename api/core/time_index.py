@@ -0,0 +1,250 @@
+"""
+BESS Time Index
+===============
+Sidecar index per metric CSV that maps each day of data to the byte range and row
+count holding it, so a date-filtered read seeks to the relevant slice instead of
+parsing the whole history. Indexes are refreshed incrementally when a file grows
+by appending and rebuilt when it is rewritten.
+"""
+
+import io
+import os
+import re
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.config import TIME_INDEX_ENABLED, COLUMNAR_CACHE_PATH
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".tindex.json"
+SCAN_BLOCK_SIZE = 4 * 1024 * 1024
+FINGERPRINT_BYTES = 4096
+DAY_KEY_LENGTH = 10  # "YYYY-MM-DD"
+DAY_KEY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_index_memo: Dict[Path, dict] = {}
+_file_locks: Dict[Path, threading.Lock] = {}
+_index_lock = threading.Lock()
+
+
+def index_path_for(file_path: Path) -> Path:
+    """Location of the sidecar index of a metric CSV: <cache>/<device_id>/<metric>.tindex.json"""
+    return COLUMNAR_CACHE_PATH / file_path.parent.name / (file_path.stem + INDEX_SUFFIX)
+
+
+def head_fingerprint(file_path: Path, length: int) -> str:
+    """Hash of the leading bytes, used to tell an append apart from a rewrite"""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read(min(length, FINGERPRINT_BYTES))).hexdigest()
+
+
+def _scan_segments(file_path: Path, offset: int, segments: List[list]) -> dict:
+    """
+    Scan complete lines from `offset` and extend `segments` ([day, offset, length, rows])
+    in place. Returns scan state: the offset after the last complete line and whether
+    a partial trailing line was seen.
+    """
+    carry = b""
+    carry_offset = offset
+    valid = True
+    partial_tail = False
+
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            block = f.read(SCAN_BLOCK_SIZE)
+            at_eof = not block
+            buf = carry + block
+            if not buf:
+                break
+            if at_eof:
+                # Index an unterminated last line too; it forces a full rebuild on refresh
+                partial_tail = True
+                buf += b'\n'
+
+            arr = np.frombuffer(buf, dtype=np.uint8)
+            newlines = np.flatnonzero(arr == 10)
+            if len(newlines) == 0:
+                carry = buf
+                continue
+
+            starts = np.concatenate(([0], newlines[:-1] + 1))
+            ends = newlines + 1  # Exclusive, includes the newline
+
+            # Skip blank lines; a leading quote around the timestamp is tolerated
+            content_len = newlines - starts
+            keep = content_len > 1
+            starts, ends = starts[keep], ends[keep]
+
+            if len(starts):
+                key_starts = starts + (arr[starts] == ord('"'))
+                key_idx = np.minimum(key_starts[:, None] + np.arange(DAY_KEY_LENGTH), len(arr) - 1)
+                keys = np.ascontiguousarray(arr[key_idx]).view(f"S{DAY_KEY_LENGTH}").ravel()
+
+                # Runs of consecutive lines sharing the same day
+                boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+                run_starts = np.concatenate(([0], boundaries))
+                run_ends = np.concatenate((boundaries, [len(keys)]))
+
+                for run_start, run_end in zip(run_starts, run_ends):
+                    day = keys[run_start].decode('ascii', errors='replace')
+                    if not DAY_KEY_PATTERN.match(day):
+                        valid = False
+                        break
+                    seg_offset = carry_offset + int(starts[run_start])
+                    seg_length = int(ends[run_end - 1] - starts[run_start])
+                    rows = int(run_end - run_start)
+                    last = segments[-1] if segments else None
+                    if last and last[0] == day and last[1] + last[2] == seg_offset:
+                        last[2] += seg_length
+                        last[3] += rows
+                    else:
+                        segments.append([day, seg_offset, seg_length, rows])
+                if not valid:
+                    break
+
+            consumed = int(newlines[-1]) + 1
+            carry = buf[consumed:]
+            carry_offset += consumed
+            if at_eof:
+                break
+
+    if partial_tail:
+        carry_offset -= 1  # Drop the newline added for the unterminated line
+    return {'valid': valid, 'indexed_size': carry_offset, 'partial_tail': partial_tail}
+
+
+def build_index(file_path: Path, previous: dict = None) -> Optional[dict]:
+    """
+    Build (or extend, when `previous` covers an unchanged prefix) the time index of a CSV.
+    Returns None when the file's first column is not an ISO timestamp.
+    """
+    stat = file_path.stat()
+
+    if previous is not None:
+        segments = [list(seg) for seg in previous['segments']]
+        header = previous['header']
+        data_start = previous['data_start']
+        scan_from = previous['indexed_size']
+    else:
+        with open(file_path, 'rb') as f:
+            header_line = f.readline()
+        header = header_line.decode('utf-8', errors='replace').rstrip('\r\n')
+        if not header.split(',')[0].strip('"') == 'ts':
+            return None
+        segments = []
+        data_start = len(header_line)
+        scan_from = data_start
+
+    state = _scan_segments(file_path, scan_from, segments)
+    if not state['valid']:
+        return None
+
+    return {
+        'version': INDEX_VERSION,
+        'header': header,
+        'data_start': data_start,
+        'indexed_size': state['indexed_size'],
+        'partial_tail': state['partial_tail'],
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_size': stat.st_size,
+        'fingerprint': head_fingerprint(file_path, state['indexed_size']),
+        'segments': segments,
+    }
+
+
+def _load_index(file_path: Path) -> Optional[dict]:
+    target = index_path_for(file_path)
+    if not target.exists():
+        return None
+    try:
+        with open(target) as f:
+            index = json.load(f)
+        return index if index.get('version') == INDEX_VERSION else None
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable time index {target}: {e}")
+        return None
+
+
+def _save_index(file_path: Path, index: dict):
+    target = index_path_for(file_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp_path, target)
+
+
+def ensure_index(file_path: Path) -> Optional[dict]:
+    """
+    Return an up-to-date time index for a metric CSV, building it on first use and
+    scanning only the appended bytes when the file has grown since it was indexed.
+    """
+    if not TIME_INDEX_ENABLED:
+        return None
+
+    with _index_lock:
+        file_lock = _file_locks.setdefault(file_path, threading.Lock())
+
+    # One build per file at a time; different files index in parallel
+    with file_lock:
+        stat = file_path.stat()
+        index = _index_memo.get(file_path)
+        if index is None:
+            index = _load_index(file_path)
+
+        if (index is not None and index['source_mtime_ns'] == stat.st_mtime_ns
+                and index['source_size'] == stat.st_size):
+            _index_memo[file_path] = index
+            return None if index.get('unindexable') else index
+
+        # Appends keep the indexed prefix intact; anything else needs a full rebuild
+        appended = (index is not None and not index.get('unindexable') and not index['partial_tail']
+                    and stat.st_size > index['indexed_size']
+                    and head_fingerprint(file_path, index['indexed_size']) == index['fingerprint'])
+        try:
+            index = build_index(file_path, index if appended else None)
+        except Exception as e:
+            print(f"WARNING: Could not index {file_path}: {e}")
+            index = None
+
+        if index is None:
+            # Remember the failure for this file version instead of rescanning on every read
+            _index_memo[file_path] = {'unindexable': True, 'source_mtime_ns': stat.st_mtime_ns,
+                                      'source_size': stat.st_size}
+            return None
+
+        _save_index(file_path, index)
+        _index_memo[file_path] = index
+        return index
+
+
+def read_time_range(file_path: Path, start: datetime, end: datetime) -> Optional[pd.DataFrame]:
+    """
+    Parse only the days of a CSV between `start` and `end` (both days inclusive).
+    Rows outside the exact bounds are not filtered here. Returns None when the
+    file cannot be indexed so the caller can fall back to a full read.
+    """
+    index = ensure_index(file_path)
+    if index is None:
+        return None
+
+    start_day = pd.Timestamp(start).strftime('%Y-%m-%d')
+    end_day = pd.Timestamp(end).strftime('%Y-%m-%d')
+    segments = [seg for seg in index['segments'] if start_day <= seg[0] <= end_day]
+
+    parts = [(index['header'] + '\n').encode('utf-8')]
+    with open(file_path, 'rb') as f:
+        for _, offset, length, _ in segments:
+            f.seek(offset)
+            chunk = f.read(length)
+            parts.append(chunk if chunk.endswith(b'\n') else chunk + b'\n')
+
+    return pd.read_csv(io.BytesIO(b''.join(parts)))
+
@@ -0,0 +1,109 @@
+"""
+BESS Warm-up
+============
+Background pre-building of datasets after startup. Targets (device, date) are
+planned and built on a small worker pool while the API already serves traffic;
+requests for a target that is still building join that build through the
+manager cache instead of starting their own. Progress is kept per target so a
+health endpoint can report it.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.config import WARMUP_WORKERS
+
+Target = Tuple[str, Optional[str]]
+
+
+class WarmupService:
+    """
+    Runs `build(device_id, date)` for every target returned by `plan()` on a
+    bounded pool. `plan` runs in the background as well, since it may scan files.
+    A build that returns False skipped its target.
+    """
+
+    def __init__(self, plan: Callable[[], List[Target]], build: Callable[[str, Optional[str]], Any],
+                 workers: int = WARMUP_WORKERS):
+        self.plan = plan
+        self.build = build
+        self.workers = workers
+
+        self.state = "idle"  # idle, planning, running, done
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self._targets: Dict[Target, dict] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self):
+        """Plan and build in the background; returns immediately, at most once"""
+        with self._lock:
+            if self.state != "idle":
+                return
+            self.state = "planning"
+            self.started_at = time.time()
+        threading.Thread(target=self._run, name="warmup-planner", daemon=True).start()
+
+    def _run(self):
+        try:
+            targets = list(dict.fromkeys(self.plan()))
+        except Exception as e:
+            print(f"Warm-up planning failed: {e}")
+            with self._lock:
+                self.error = str(e)
+                self.state = "done"
+                self.finished_at = time.time()
+            return
+
+        with self._lock:
+            self._targets = {target: {'status': 'pending', 'seconds': None, 'error': None}
+                             for target in targets}
+            self.state = "running" if targets else "done"
+            if not targets:
+                self.finished_at = time.time()
+                return
+        print(f"Warming {len(targets)} datasets on {self.workers} workers")
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup")
+        for target in targets:
+            self._executor.submit(self._build_target, target)
+        self._executor.shutdown(wait=False)
+
+    def _build_target(self, target: Target):
+        entry = self._targets[target]
+        entry['status'] = 'building'
+        started = time.time()
+        try:
+            entry['status'] = 'skipped' if self.build(*target) is False else 'ready'
+        except Exception as e:
+            print(f"Warm-up of {target[0]} ({target[1] or 'auto'}) failed: {e}")
+            entry['status'] = 'failed'
+            entry['error'] = str(e)
+        entry['seconds'] = round(time.time() - started, 2)
+
+        with self._lock:
+            if all(item['status'] in ('ready', 'skipped', 'failed') for item in self._targets.values()):
+                self.state = "done"
+                self.finished_at = time.time()
+                print(f"Warm-up finished in {self.finished_at - self.started_at:.1f}s")
+
+    def progress(self) -> Dict[str, Any]:
+        """Overall state, counts per status and per-target details"""
+        with self._lock:
+            targets = [{'device_id': device_id, 'date': date or 'auto', **entry}
+                       for (device_id, date), entry in self._targets.items()]
+        counts = {status: sum(1 for target in targets if target['status'] == status)
+                  for status in ('pending', 'building', 'ready', 'skipped', 'failed')}
+        end = self.finished_at or time.time()
+        return {
+            'state': self.state,
+            'total': len(targets),
+            **counts,
+            'elapsed_seconds': round(end - self.started_at, 1) if self.started_at else None,
+            'error': self.error,
+            'targets': targets,
+        }
@@ -4,19 +4,31 @@ BESS Battery Management System API
 FastAPI application for optimized real-time BESS data access.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from routers import bess, ai_analysis
+from core.warmup import WarmupService
 from core.config import *
 
+# Build datasets in the background so the first requests after a deploy hit a warm cache
+warmup = WarmupService(bess.warmup_targets, bess.warm_dataset)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_ENABLED:
+        warmup.start()
+    yield
+
 app = FastAPI(
     title=API_TITLE,
     description=API_DESCRIPTION,
     version=API_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend integration
@@ -35,6 +47,11 @@ app.add_middleware(
 app.include_router(bess.router, prefix="/bess", tags=["BESS - Unified Energy Storage"])
 app.include_router(ai_analysis.router, prefix="/ai", tags=["AI Analysis"])
 
+@app.get("/health/warmup")
+def get_warmup_progress():
+    """Warm-up state with counts of pending, building, ready, skipped and failed datasets"""
+    return warmup.progress()
+
 @app.get("/")
 def get_api_info():
     """Get API information and available endpoints"""
@@ -49,6 +66,11 @@ def get_api_info():
             "devices": "/bess/devices",
             "data": "/bess/{device_id}",
             "stream": "/bess/{device_id}/stream",
+            "websocket": "/bess/ws",
+            "aggregate": "/bess/{device_id}/aggregate",
+            "fleet": "/bess/fleet",
+            "fleet_summary": "/bess/fleet/summary",
+            "warmup": "/health/warmup",
             "ai_analysis": "/ai/analyze",
             "ai_prompts": "/ai/prompts",
             "device_analysis": "/ai/device-analysis/{device_id}"
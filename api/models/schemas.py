@@ -39,6 +39,9 @@ class DeviceInfo(BaseModel):
     device_id: str = Field(description="Device identifier")
     available_metrics: List[str] = Field(description="Available BMS metrics")
     total_rows_per_metric: Dict[str, int] = Field(description="Total rows available per metric")
+    first_timestamp: Optional[datetime] = Field(None, description="Earliest reading of any metric")
+    last_timestamp: Optional[datetime] = Field(None, description="Latest reading of any metric")
+    last_seen: Optional[datetime] = Field(None, description="When the device's metric files were last written")
 
 class DevicesResponse(BaseModel):
     """Response model for available devices"""
@@ -129,6 +132,8 @@ class BESSResponse(BaseModel):
     device_id: str = Field(description="Device identifier")
     total_records: int = Field(description="Number of records returned", ge=0)
     batch_size: int = Field(description="Requested batch size", ge=1)
+    total_available: Optional[int] = Field(None, description="Records available for paging with these parameters", ge=0)
+    next_cursor: Optional[str] = Field(None, description="Cursor for the page after this one; null on the last page")
     data: List[BESSReading] = Field(description="Synchronized BESS readings")
 
 class APIError(BaseModel):
@@ -0,0 +1,72 @@
+"""
+Test fixtures: a small synthetic BESS data directory. Data paths in core.config
+are relative to the working directory, so the tests run from a temporary api/
+directory next to the generated data, the same layout as the repository.
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+
+DEVICE_ID = "TESTDEV0000000001"
+DATA_START = pd.Timestamp("2024-01-01")
+DATA_DAYS = 3
+
+# Metric files in the layout of the hackathon data, with their sampling steps in seconds
+METRIC_FILES = {
+    "bms1_soc": 30, "bms1_soh": 60, "bms1_v": 300, "bms1_c": 30, "bms1_cell_ave_v": 60, "bms1_cell_ave_t": 300,
+    "pcs1_ap": 30, "pcs1_dcv": 60, "pcs1_dcc": 300, "pcs1_ia": 30, "pcs1_uab": 60, "pcs1_t_igbt": 300,
+    "ac1_outside_t": 30, "dh1_humi": 60, "dh1_temp": 300, "bms1_cell_max_v": 30, "bms1_cell_min_v": 60,
+    "bms1_cell_v_diff": 300, "bms1_cell_t_diff": 30, "pcs1_ib": 60, "pcs1_ic": 300, "pcs1_ubc": 30,
+    "pcs1_uca": 60, "pcs1_t_env": 300, "ac1_outwater_t": 30, "ac1_rtnwater_pre": 60, "aux_m_ap": 300,
+    "fa1_smokeFlag": 60,
+}
+
+
+def write_metric_files(device_path: Path, days: int = DATA_DAYS, seed: int = 0):
+    """Jittered, partly missing series per metric file, like the recorded data"""
+    rng = np.random.default_rng(seed)
+    device_path.mkdir(parents=True, exist_ok=True)
+    for name, step in METRIC_FILES.items():
+        n = days * 86400 // step
+        ts = DATA_START + pd.to_timedelta(np.arange(n) * step + rng.integers(0, 5, n), unit='s')
+        if name == "fa1_smokeFlag":
+            values = (rng.random(n) > 0.995).astype(float)
+        elif name == "bms1_soc":
+            values = np.round(50 + 40 * np.sin(np.arange(n) / 500), 1)
+        else:
+            values = np.round(rng.normal(60, 5, n), 2)
+        values[rng.random(n) < 0.01] = np.nan
+        pd.DataFrame({'ts': ts.strftime('%Y-%m-%d %H:%M:%S'), name: values}).to_csv(
+            device_path / f"{name}.csv", index=False)
+
+
+_root = Path(tempfile.mkdtemp(prefix="bess-tests-"))
+write_metric_files(_root / "data" / "energy_hackathon_data" / "BESS" / DEVICE_ID)
+(_root / "api").mkdir()
+os.chdir(_root / "api")
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def cold_cache():
+    """Start without cached managers or responses"""
+    from routers import bess
+    bess._manager_cache.clear(include_pinned=True)
+    bess._response_cache.clear()
+    yield
+    bess._manager_cache.clear(include_pinned=True)
+    bess._response_cache.clear()
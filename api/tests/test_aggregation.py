@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DEVICE_ID
+from core.aggregation import aggregate_metric
+
+
+def test_empty_range_with_percentiles(client):
+    response = client.get(f"/bess/{DEVICE_ID}/aggregate", params={
+        "metrics": "bms_soc,pcs_apparent_power", "start": "2023-06-01T00:00:00", "end": "2023-06-01T00:30:00",
+        "bucket": "7min", "agg": "mean,p50,p95,p50.0,last,count"})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["timestamps"] == []
+    assert body["metrics"]["bms_soc"]["source"] == "raw"
+    assert body["metrics"]["bms_soc"]["p95"] == []
+
+
+def test_rollup_and_raw_last_agree_on_unsorted_files(tmp_path):
+    file_path = tmp_path / "UNSORTEDDEVICE" / "bms1_soc.csv"
+    file_path.parent.mkdir()
+    ts = pd.date_range("2024-01-01", periods=24 * 60, freq="1min")
+    order = np.random.default_rng(1).permutation(len(ts))
+    pd.DataFrame({'ts': ts[order].strftime('%Y-%m-%d %H:%M:%S'), 'bms1_soc': np.arange(len(ts))[order] * 1.0}).to_csv(
+        file_path, index=False)
+    start, end = pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02")
+
+    rollup_source, rollup = aggregate_metric(file_path, 3600, ["last", "max", "count"], start, end)
+    raw_source, raw = aggregate_metric(file_path, 3600, ["last", "max", "count", "p50"], start, end)
+
+    assert (rollup_source, raw_source) == ("rollup", "raw")
+    np.testing.assert_array_equal(rollup["last"].to_numpy(), raw["last"].to_numpy())
+    # The latest reading of every hour is its 60th minute
+    np.testing.assert_array_equal(raw["last"].to_numpy(), np.arange(59, 24 * 60, 60))
+
+
+def test_bucket_cap_is_checked_before_aggregating(client, monkeypatch):
+    from routers import bess
+    monkeypatch.setattr(bess, "MAX_AGGREGATE_BUCKETS", 100)
+    monkeypatch.setattr(bess, "aggregate_metric", lambda *args: pytest.fail("aggregated before the cap check"))
+
+    # The open range spans the 3 days of data: 72 hourly buckets fit, 4320 minutes do not
+    too_many = client.get(f"/bess/{DEVICE_ID}/aggregate", params={"metrics": "bms_soc", "bucket": "1min"})
+    assert too_many.status_code == 400
+    assert "buckets" in too_many.json()["detail"]
+    half_open = client.get(f"/bess/{DEVICE_ID}/aggregate", params={
+        "metrics": "bms_soc", "bucket": "1min", "start": "2024-01-03T00:00:00"})
+    assert half_open.status_code == 400
+
+
+def test_open_range_within_cap(client, monkeypatch):
+    from routers import bess
+    monkeypatch.setattr(bess, "MAX_AGGREGATE_BUCKETS", 100)
+    response = client.get(f"/bess/{DEVICE_ID}/aggregate", params={"metrics": "bms_soc", "bucket": "1h"})
+    assert response.status_code == 200
+    assert len(response.json()["timestamps"]) == 72
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.alignment import asof_indexer, align_metric
+
+SECOND = 10**9
+
+
+@pytest.mark.parametrize("direction, expected", [
+    ("nearest", [-1, 0, 0, 1, 1, -1]),
+    ("backward", [-1, 0, 0, -1, 1, -1]),
+    ("forward", [-1, 0, 1, 1, -1, -1]),
+])
+def test_directions_and_tolerance_edges(direction, expected):
+    source = np.array([10, 20]) * SECOND
+    # Out of reach before, exact hit, tie at the tolerance, then either side of the last sample
+    base = np.array([4, 10, 15, 16, 24, 26]) * SECOND
+
+    assert asof_indexer(base, source, 5 * SECOND, direction).tolist() == expected
+
+
+def test_tolerance_is_inclusive():
+    source = np.array([0, 60]) * SECOND
+    assert asof_indexer(np.array([90]) * SECOND, source, 30 * SECOND, "nearest").tolist() == [1]
+    assert asof_indexer(np.array([91]) * SECOND, source, 30 * SECOND, "nearest").tolist() == [-1]
+
+
+def test_invalid_direction():
+    with pytest.raises(ValueError):
+        asof_indexer(np.array([0]), np.array([0]), 0, "sideways")
+
+
+def test_align_metric_values_and_offsets():
+    base = pd.date_range("2024-01-01", periods=4, freq="1min").values.view('int64')
+    source = base[[0, 2]] + 10 * SECOND
+    values, offsets = align_metric(base, source, np.array(["1.5", "bad"], dtype=object),
+                                   pd.Timedelta(seconds=30), "nearest")
+
+    # Unparseable readings and unmatched base rows are both missing
+    np.testing.assert_array_equal(values, [1.5, np.nan, np.nan, np.nan])
+    np.testing.assert_array_equal(offsets, [10, np.nan, 10, np.nan])
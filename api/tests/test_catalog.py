@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from conftest import DEVICE_ID, write_metric_files
+from core import catalog
+from core.columnar_cache import parse_metric_csv, write_cache
+from core.config import DATA_BASE_PATH
+from core.data_manager import SimpleBESSDataManager
+
+
+def test_cold_catalog_reads_only_first_and_last_day(tmp_path, monkeypatch):
+    device_path = tmp_path / "CATALOGDEVICE001"
+    write_metric_files(device_path, days=6, seed=3)
+    file_path = device_path / "bms1_soc.csv"
+    full = parse_metric_csv(file_path)
+    parsed_rows = []
+    real_read_time_range = catalog.read_time_range
+
+    def read_time_range(path, start, end):
+        df = real_read_time_range(path, start, end)
+        parsed_rows.append(len(df))
+        return df
+
+    monkeypatch.setattr(catalog, "read_time_range", read_time_range)
+    monkeypatch.setattr(catalog, "read_metric_file", lambda *args, **kwargs: pytest.fail("full CSV parse"))
+    monkeypatch.setattr(catalog, "schedule_conversion", lambda path: None)
+
+    entry = catalog.compute_file_stats(file_path)
+
+    assert entry['estimated']
+    assert sum(parsed_rows) == len(full) // 3
+    assert entry['row_count'] == len(full)
+    assert entry['first_ts'] == full['ts'].min().isoformat()
+    assert entry['last_ts'] == full['ts'].max().isoformat()
+    assert entry['days'] == [f"2024-01-0{day}" for day in range(1, 7)]
+    assert entry['median_interval_s'] == pytest.approx(30, abs=5)
+
+
+def test_estimated_entries_are_refreshed_from_the_columnar_copy(tmp_path, monkeypatch):
+    device_path = tmp_path / "CATALOGDEVICE002"
+    write_metric_files(device_path, days=2, seed=4)
+    monkeypatch.setattr(catalog, "schedule_conversion", lambda path: None)
+
+    assert catalog.get_device_catalog(device_path, ["bms1_soc.csv"])["bms1_soc.csv"]['estimated']
+    write_cache(device_path / "bms1_soc.csv")
+    entry = catalog.get_device_catalog(device_path, ["bms1_soc.csv"])["bms1_soc.csv"]
+
+    full = parse_metric_csv(device_path / "bms1_soc.csv")
+    assert 'estimated' not in entry
+    assert entry['null_ratio'] == pytest.approx(float(full['bms1_soc'].isna().mean()))
+
+
+def test_auto_period_is_the_overlap_of_whole_core_metric_files():
+    manager = SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH)
+    spans = [parse_metric_csv(DATA_BASE_PATH / DEVICE_ID / filename)['ts']
+             for filename in manager.core_metrics.values()]
+
+    start, end = manager.find_best_time_period()
+
+    assert start == max(ts.min() for ts in spans)
+    assert end == min(ts.max() for ts in spans)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DEVICE_ID, DATA_START, DATA_DAYS
+from core.config import DATA_BASE_PATH
+from core.data_manager import SimpleBESSDataManager
+from core.downsampling import DOWNSAMPLE_MODES, downsample
+
+
+def _coverage(df: pd.DataFrame) -> float:
+    """Share of metric cells holding a value"""
+    return float(df.drop(columns='timestamp').notna().to_numpy().mean())
+
+
+def _flag_transitions(df: pd.DataFrame) -> int:
+    flags = df['safety_smoke_flag'].dropna().to_numpy()
+    return int((flags[1:] != flags[:-1]).sum())
+
+
+# Decimated rows end up further apart than the alignment tolerance
+TARGET_POINTS = 100
+
+
+def _unified(target_points: int, mode: str) -> pd.DataFrame:
+    manager = SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH, target_points=target_points, downsample_mode=mode,
+                                    start_time=DATA_START, end_time=DATA_START + pd.Timedelta(days=DATA_DAYS))
+    return manager.create_unified_dataset(max_records=10 ** 6)
+
+
+@pytest.mark.parametrize("mode", DOWNSAMPLE_MODES)
+def test_decimation_keeps_alignment_coverage(mode):
+    full = _unified(10 ** 6, "stride")
+    decimated = _unified(TARGET_POINTS, mode)
+
+    # Flag transitions are kept on top of the target
+    assert len(decimated) <= TARGET_POINTS + 2 * _flag_transitions(full)
+    assert len(decimated) < len(full)
+    assert _coverage(decimated) >= _coverage(full) - 0.01
+
+
+@pytest.mark.parametrize("mode", ["lttb", "minmax", "stride"])
+def test_decimation_picks_rows_of_the_aligned_frame(mode):
+    full = _unified(10 ** 6, "stride")
+    decimated = _unified(TARGET_POINTS, mode)
+
+    rows = full.set_index('timestamp').loc[decimated['timestamp']].reset_index()
+    pd.testing.assert_frame_equal(rows, decimated)
+
+
+@pytest.mark.parametrize("mode", ["lttb", "minmax"])
+def test_spikes_survive_in_every_metric(mode):
+    n = 10000
+    key, current = np.zeros(n), np.sin(np.arange(n) / 300)
+    key[6789] = 100.0
+    current[1234] = 900.0
+    frame = pd.DataFrame({'timestamp': pd.date_range("2024-01-01", periods=n, freq="30s"),
+                          'key': key, 'bms_current': current, 'other': np.arange(n, dtype=float)})
+
+    reduced = downsample(frame, 200, mode)
+
+    assert len(reduced) <= 200
+    assert reduced['key'].max() == 100.0
+    assert reduced['bms_current'].max() == 900.0
+    # Rows are kept whole, so the other metrics stay on the spike's timestamp
+    assert reduced.loc[reduced['bms_current'] == 900.0, 'other'].item() == 1234.0
+
+
+@pytest.mark.parametrize("mode", DOWNSAMPLE_MODES)
+def test_flag_transitions_survive(mode):
+    n = 10000
+    flag = np.zeros(n)
+    flag[4000:4003] = 1.0
+    frame = pd.DataFrame({'timestamp': pd.date_range("2024-01-01", periods=n, freq="30s"),
+                          'bms_soc': np.linspace(0, 100, n), 'safety_smoke_flag': flag})
+
+    reduced = downsample(frame, 100, mode, flag_metrics={'safety_smoke_flag'})
+
+    assert reduced['safety_smoke_flag'].max() == 1.0
+    if mode != "mean":
+        kept = set(reduced['bms_soc'])
+        assert {frame['bms_soc'][i] for i in (3999, 4000, 4002, 4003)} <= kept
+
+
+def test_dataset_keeps_spikes_of_non_base_metrics(tmp_path):
+    from conftest import write_metric_files
+    from core import data_manager
+    device_path = tmp_path / "SPIKEDEVICE00001"
+    write_metric_files(device_path, days=1, seed=5)
+    current = pd.read_csv(device_path / "bms1_c.csv")
+    current.loc[1000, 'bms1_c'] = 900.0
+    current.to_csv(device_path / "bms1_c.csv", index=False)
+    smoke = pd.read_csv(device_path / "fa1_smokeFlag.csv")
+    smoke['fa1_smokeFlag'] = 0.0
+    smoke.loc[700:702, 'fa1_smokeFlag'] = 1.0
+    smoke.to_csv(device_path / "fa1_smokeFlag.csv", index=False)
+
+    for mode in ["lttb", "minmax", "stride"]:
+        manager = data_manager.SimpleBESSDataManager(device_path.name, tmp_path, target_points=200, downsample_mode=mode,
+                                                     start_time=DATA_START, end_time=DATA_START + pd.Timedelta(days=1))
+        unified = manager.create_unified_dataset(max_records=10 ** 6)
+        assert unified['safety_smoke_flag'].max() == 1, mode
+        if mode != "stride":
+            assert unified['bms_current'].max() == 900.0, mode
@@ -0,0 +1,48 @@
+import time
+import numpy as np
+import pandas as pd
+
+from conftest import DEVICE_ID
+from routers import bess
+
+RANGE = {"start": "2024-01-02T06:00:00", "end": "2024-01-02T12:00:00"}
+
+
+def test_devices_share_one_grid(client):
+    response = client.get("/bess/fleet", params={
+        **RANGE, "devices": f"{DEVICE_ID},NOSUCHDEVICE", "metrics": "bms_soc,safety_smoke_flag", "step": "15min"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["devices"] == [DEVICE_ID]
+    assert "NOSUCHDEVICE" in body["errors"]
+    assert body["timestamps"][:2] == ["2024-01-02T06:00:00", "2024-01-02T06:15:00"]
+    assert len(body["timestamps"]) == 24 == len(body["data"][DEVICE_ID]["bms_soc"])
+
+    # Every grid point holds the reading of the nearest row of the device's own range query
+    rows = client.get(f"/bess/{DEVICE_ID}", params={**RANGE, "batch_size": 1000}).json()["data"]
+    row_ns = pd.to_datetime([row["timestamp"] for row in rows]).values.view('int64')
+    for timestamp, value in zip(body["timestamps"], body["data"][DEVICE_ID]["bms_soc"]):
+        nearest = rows[int(np.argmin(np.abs(row_ns - pd.Timestamp(timestamp).value)))]
+        assert value == nearest.get("bms_soc")
+    assert set(body["data"][DEVICE_ID]["safety_smoke_flag"]) <= {True, False, None}
+
+
+class SlowManager:
+    def grid_values(self, grid_ns, metrics, tolerance):
+        time.sleep(0.3)
+        return {metric: np.full(len(grid_ns), 1.0) for metric in metrics}
+
+
+def test_devices_load_in_parallel(client, monkeypatch):
+    monkeypatch.setattr(bess, "get_cached_range_manager", lambda device_id, start, end: SlowManager())
+    devices = ",".join(f"DEVICE{i}" for i in range(4))
+
+    started = time.perf_counter()
+    response = client.get("/bess/fleet", params={**RANGE, "devices": devices, "metrics": "bms_soc", "points": 10})
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert response.json()["devices"] == devices.split(",")
+    # Close to one device's latency rather than the sum of four
+    assert elapsed < 0.9
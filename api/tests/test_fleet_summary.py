@@ -0,0 +1,84 @@
+import os
+import numpy as np
+import pandas as pd
+
+from core.fleet_summary import FleetSummary
+
+METRIC_FILES = {"bms_soc": "bms1_soc.csv", "bms_current": "bms1_c.csv"}
+
+
+def write_series(file_path, column, values):
+    ts = pd.date_range("2024-01-01", periods=len(values), freq="20s")
+    pd.DataFrame({'ts': ts.strftime('%Y-%m-%d %H:%M:%S'), column: values}).to_csv(file_path, index=False)
+
+
+def test_latest_values_and_times(tmp_path):
+    device_path = tmp_path / "FLEETDEVICE00001"
+    device_path.mkdir()
+    write_series(device_path / "bms1_soc.csv", "bms1_soc", np.full(500, 3.3))
+    write_series(device_path / "bms1_c.csv", "bms1_c", np.full(500, 60.0))
+
+    device = FleetSummary(tmp_path, list(METRIC_FILES)).summary(METRIC_FILES)['devices']["FLEETDEVICE00001"]
+
+    soc = device['metrics']['bms_soc']
+    # float32 readings come back as written, not as 3.2999999523
+    assert (soc['latest'], soc['day_min'], soc['day_max'], soc['day_mean']) == (3.3, 3.3, 3.3, 3.3)
+    assert soc['latest_at'] == "2024-01-01T02:46:00"
+    assert device['last_seen'] == "2024-01-01T02:46:00"
+
+
+def test_rewrite_of_same_size_restarts_throughput(tmp_path):
+    device_path = tmp_path / "FLEETDEVICE00002"
+    device_path.mkdir()
+    file_path = device_path / "bms1_c.csv"
+    write_series(file_path, "bms1_c", np.full(540, 60))
+    fleet = FleetSummary(tmp_path, ["bms_current"], refresh_seconds=0)
+    before = fleet.summary(METRIC_FILES)['devices']["FLEETDEVICE00002"]['throughput']
+    assert before['charge_ah'] > 0 and before['discharge_ah'] == 0
+
+    # Same length, different content: a rewrite, not an append
+    size = file_path.stat().st_size
+    write_series(file_path, "bms1_c", np.full(540, -6))
+    assert file_path.stat().st_size == size
+    os.utime(file_path, ns=(file_path.stat().st_atime_ns, file_path.stat().st_mtime_ns + 10**9))
+
+    after = fleet.summary(METRIC_FILES)['devices']["FLEETDEVICE00002"]['throughput']
+    assert after['charge_ah'] == 0 and after['discharge_ah'] > 0
+
+
+def test_charge_and_discharge_follow_the_current_sign(tmp_path, monkeypatch):
+    from core import fleet_summary
+    device_path = tmp_path / "FLEETDEVICE00003"
+    device_path.mkdir()
+    # Two hours at +30 A, then one hour at -60 A, sampled every 20 s
+    write_series(device_path / "bms1_c.csv", "bms1_c", np.concatenate((np.full(360, 30.0), np.full(180, -60.0))))
+
+    throughput = FleetSummary(tmp_path, ["bms_current"]).summary(METRIC_FILES)['devices']["FLEETDEVICE00003"]['throughput']
+    assert throughput == {'charge_ah': 60.0, 'discharge_ah': 60.0}
+
+    monkeypatch.setattr(fleet_summary, "FLEET_CHARGE_CURRENT_SIGN", -1)
+    throughput = FleetSummary(tmp_path, ["bms_current"]).summary(METRIC_FILES)['devices']["FLEETDEVICE00003"]['throughput']
+    assert throughput == {'charge_ah': 60.0, 'discharge_ah': 60.0}
+
+
+def test_failing_files_are_skipped_until_they_change(tmp_path, monkeypatch):
+    from core import fleet_summary
+    device_path = tmp_path / "FLEETDEVICE00004"
+    device_path.mkdir()
+    write_series(device_path / "bms1_soc.csv", "bms1_soc", np.full(100, 50.0))
+    reads = []
+
+    def broken_pyramid(file_path):
+        reads.append(file_path)
+        raise ValueError("unreadable")
+
+    monkeypatch.setattr(fleet_summary, "get_pyramid", broken_pyramid)
+    fleet = FleetSummary(tmp_path, ["bms_soc"], refresh_seconds=0)
+    for _ in range(3):
+        device = fleet.summary(METRIC_FILES)['devices']["FLEETDEVICE00004"]
+    assert len(reads) == 1
+    assert device['metrics'] == {}
+
+    write_series(device_path / "bms1_soc.csv", "bms1_soc", np.full(101, 50.0))
+    fleet.summary(METRIC_FILES)
+    assert len(reads) == 2
@@ -0,0 +1,102 @@
+from conftest import DEVICE_ID
+from core import manager_cache
+from core.manager_cache import ManagerCache
+
+
+class Sized:
+    def __init__(self, size):
+        self.size = size
+
+
+def _cache(**kwargs):
+    measured = []
+
+    def sizer(value):
+        measured.append(value)
+        return value.size
+
+    return ManagerCache(sizer=sizer, **kwargs), measured
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache, _ = _cache(max_bytes=300)
+    for key in "abc":
+        cache.put(key, Sized(100))
+    cache.get("a")
+    cache.put("d", Sized(100))
+
+    assert [key for key, _ in cache.items()] == ["c", "a", "d"]
+    assert cache.stats()['evictions'] == 1
+    assert cache.total_bytes == 300
+
+
+def test_entry_limit():
+    cache, _ = _cache(max_bytes=None, max_entries=2)
+    for key in "abc":
+        cache.put(key, Sized(1))
+    assert "a" not in cache and len(cache) == 2
+
+
+def test_lookups_do_not_measure_entries():
+    cache, measured = _cache(max_bytes=1000)
+    value = Sized(10)
+    cache.put("a", value)
+    for _ in range(5):
+        assert cache.get("a") is value
+    cache.stats()
+
+    assert len(measured) == 1
+
+
+def test_resize_measures_again_and_evicts_others():
+    cache, measured = _cache(max_bytes=300)
+    grower = Sized(0)
+    cache.put("a", Sized(100))
+    cache.put("b", Sized(100))
+    cache.put("grower", grower)
+
+    grower.size = 150
+    cache.resize("grower")
+
+    assert "a" not in cache and "grower" in cache
+    assert cache.total_bytes == 250
+    assert len(measured) == 4
+
+
+def test_pinned_entries_are_never_evicted():
+    cache, _ = _cache(max_bytes=150)
+    cache.put("pinned", Sized(100), pinned=True)
+    cache.put("a", Sized(100))
+    cache.put("b", Sized(100))
+
+    assert "pinned" in cache and "a" not in cache and "b" in cache
+    assert cache.clear() == 1
+    assert "pinned" in cache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(manager_cache.time, "time", lambda: now[0])
+    cache, _ = _cache(max_bytes=None, ttl_seconds=60)
+    cache.put("a", Sized(10))
+    cache.put("pinned", Sized(10), pinned=True)
+
+    now[0] += 61
+    assert cache.get("a") is None
+    assert "pinned" in cache
+    assert cache.stats()['expirations'] == 1
+    assert cache.total_bytes == 10
+
+
+def test_admin_endpoints_report_and_flush(client, cold_cache):
+    assert client.get(f"/bess/{DEVICE_ID}", params={"date": "2024-01-02", "batch_size": 5}).status_code == 200
+    stats = client.get("/bess/admin/cache").json()
+
+    [item] = stats['items']
+    assert item['key'] == f"{DEVICE_ID}_2024-01-02"
+    # Sized after the lazy load, not at insertion when nothing was loaded yet
+    assert item['bytes'] > 0 and stats['bytes'] == item['bytes']
+
+    assert client.delete("/bess/admin/cache", params={"key": "missing"}).status_code == 404
+    assert client.delete("/bess/admin/cache", params={"key": item['key']}).json() == {"flushed": 1}
+    assert client.get("/bess/admin/cache").json()['entries'] == 0
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import DEVICE_ID
+
+
+def _range_rows(client, start: str, end: str) -> list:
+    """Every reading of a range query, following the cursors"""
+    rows, cursor = [], None
+    while True:
+        params = {"start": start, "end": end, "batch_size": 1000}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/bess/{DEVICE_ID}", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        rows += page["data"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return rows
+
+
+@pytest.mark.parametrize("warm_params", [
+    {"date": "2024-01-02"},                                       # Decimated day
+    {"start": "2024-01-01T00:00:00", "end": "2024-01-04T00:00:00", "points": 100},
+    {"start": "2024-01-02T00:00:00", "end": "2024-01-02T06:00:00"},  # Undecimated, covers the range
+])
+def test_range_query_does_not_depend_on_cached_managers(client, cold_cache, warm_params):
+    start, end = "2024-01-02T01:00:00", "2024-01-02T03:00:00"
+    cold = _range_rows(client, start, end)
+
+    from routers import bess
+    bess._manager_cache.clear(include_pinned=True)
+    bess._response_cache.clear()
+    warm_up = client.get(f"/bess/{DEVICE_ID}", params=warm_params)
+    assert warm_up.status_code == 200
+    warm = _range_rows(client, start, end)
+
+    assert len(cold) == 240
+    assert warm == cold
+
+
+def test_undecimated_covering_manager_is_reused(client, cold_cache):
+    from routers import bess
+    client.get(f"/bess/{DEVICE_ID}", params={"start": "2024-01-02T00:00:00", "end": "2024-01-02T06:00:00"})
+    entries = len(list(bess._manager_cache.items()))
+
+    _range_rows(client, "2024-01-02T01:00:00", "2024-01-02T03:00:00")
+
+    assert len(list(bess._manager_cache.items())) == entries
@@ -0,0 +1,67 @@
+import gzip
+import pytest
+
+from conftest import DEVICE_ID
+from core import response_cache
+from core.response_cache import ResponseCache, choose_encoding, entity_tag, etag_matches
+
+
+@pytest.mark.parametrize("header, brotli_installed, expected", [
+    (None, True, "identity"),
+    ("gzip, deflate, br", True, "br"),
+    ("gzip, deflate, br", False, "gzip"),
+    ("br;q=0, gzip;q=0.5", True, "gzip"),
+    ("*", True, "br"),
+    ("gzip;q=0, identity", True, "identity"),
+])
+def test_encoding_negotiation(monkeypatch, header, brotli_installed, expected):
+    monkeypatch.setattr(response_cache, "brotli", response_cache.brotli if brotli_installed else None)
+    if brotli_installed and response_cache.brotli is None:
+        pytest.skip("brotli is not installed")
+    assert choose_encoding(header) == expected
+
+
+def test_any_coding_of_a_representation_matches():
+    assert etag_matches(entity_tag("abc", "gzip"), "abc")
+    assert etag_matches('W/"abc", "other"', "abc")
+    assert not etag_matches('"abcd"', "abc")
+
+
+def test_bodies_are_rendered_and_compressed_once():
+    cache = ResponseCache(max_bytes=10 ** 6, min_compress_bytes=100)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return b"x" * 1000
+
+    gzipped, encoding = cache.get_body("tag", "gzip", render)
+    assert encoding == "gzip" and gzip.decompress(gzipped) == b"x" * 1000
+    assert cache.get_body("tag", "gzip", render) == (gzipped, "gzip")
+    assert cache.get_body("tag", "identity", render) == (b"x" * 1000, "identity")
+    # Small bodies are not worth compressing
+    assert cache.get_body("small", "gzip", lambda: b"{}") == (b"{}", "identity")
+    assert len(renders) == 1
+
+
+def test_conditional_get_and_compression(client, cold_cache):
+    url = f"/bess/{DEVICE_ID}"
+    params = {"date": "2024-01-02", "batch_size": 500}
+    plain = client.get(url, params=params, headers={"Accept-Encoding": "identity"})
+    zipped = client.get(url, params=params, headers={"Accept-Encoding": "gzip"})
+
+    assert plain.status_code == zipped.status_code == 200
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.content == plain.content  # Decoded by the client
+    assert zipped.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    # Past days never change
+    assert plain.headers["Cache-Control"].startswith("public, max-age=")
+
+    for etag in (plain.headers["ETag"], zipped.headers["ETag"]):
+        revalidated = client.get(url, params=params, headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+    other_page = client.get(url, params={**params, "skip": 500}, headers={"If-None-Match": plain.headers["ETag"]})
+    assert other_page.status_code == 200
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from conftest import DEVICE_ID
+from core import rollups
+from core.config import DATA_BASE_PATH
+
+
+def test_rollup_accepts_timezone_aware_bounds(client):
+    naive = client.get(f"/bess/{DEVICE_ID}/rollup", params={
+        "metrics": "bms_soc", "start": "2024-01-02T00:00:00", "end": "2024-01-02T06:00:00", "level": "1h"})
+    aware = client.get(f"/bess/{DEVICE_ID}/rollup", params={
+        "metrics": "bms_soc", "start": "2024-01-02T01:00:00+01:00", "end": "2024-01-02T06:00:00Z", "level": "1h"})
+
+    assert naive.status_code == 200
+    assert aware.status_code == 200
+    assert aware.json() == naive.json()
+    assert len(aware.json()["metrics"]["bms_soc"]["timestamps"]) == 6
+
+
+def test_pyramids_in_memory_stay_within_budget(monkeypatch):
+    files = sorted((DATA_BASE_PATH / DEVICE_ID).glob("*.csv"))[:4]
+    first = rollups.get_pyramid(files[0])
+    one_pyramid = sum(int(frame.memory_usage(index=True).sum()) for frame in first.values())
+    monkeypatch.setattr(rollups, "ROLLUP_MEMORY_BUDGET_MB", 2.5 * one_pyramid / (1024 * 1024))
+
+    for file_path in files:
+        rollups.get_pyramid(file_path)
+
+    assert len(rollups._pyramids) <= 3
+    assert files[-1] in rollups._pyramids
+    assert files[0] not in rollups._pyramids
+    # Evicted pyramids come back from their persisted levels
+    pd.testing.assert_frame_equal(rollups.get_pyramid(files[0])["1h"], first["1h"])
@@ -0,0 +1,112 @@
+import json
+import numpy as np
+import pandas as pd
+
+from conftest import DEVICE_ID
+from core.serialization import encode_rows, join_rows
+from models.schemas import BESSReading
+
+
+def _without_nulls(records):
+    return [{key: value for key, value in record.items() if value is not None} for record in records]
+
+
+def test_fast_path_matches_strict_validation(client):
+    params = {"date": "2024-01-02", "batch_size": 200, "skip": 100}
+    fast = client.get(f"/bess/{DEVICE_ID}", params=params)
+    strict = client.get(f"/bess/{DEVICE_ID}", params={**params, "strict": True})
+
+    assert fast.status_code == strict.status_code == 200
+    fast_body, strict_body = fast.json(), strict.json()
+    assert fast_body.pop("data") == _without_nulls(strict_body.pop("data"))
+    assert fast_body == strict_body
+    # Only the pre-serialized path is versioned and cacheable
+    assert "ETag" in fast.headers and "ETag" not in strict.headers
+
+
+def test_encoded_rows_drop_missing_values_and_invalid_rows():
+    frame = pd.DataFrame({
+        'timestamp': pd.to_datetime(["2024-01-01 00:00:00", "2024-01-01 00:00:30.250000", "2024-01-01 00:01:00"], format="ISO8601"),
+        'bms_soc': np.array([3.3, np.nan, 150.0], dtype=np.float32),
+        'safety_smoke_flag': pd.array([True, None, False], dtype="boolean"),
+        'not_a_field': [1.0, 2.0, 3.0],
+    })
+    row_valid = np.array([True, True, False])
+
+    rows = json.loads(join_rows(encode_rows(frame, BESSReading, row_valid)))
+
+    assert rows == [
+        {"timestamp": "2024-01-01T00:00:00", "bms_soc": 3.3, "safety_smoke_flag": True},
+        {"timestamp": "2024-01-01T00:00:30.250000"},
+        # Out of the schema's bounds: only the timestamp is kept, as strict validation does
+        {"timestamp": "2024-01-01T00:01:00"},
+    ]
+
+
+def _rows_from_columns(timestamps, metrics):
+    return [{"timestamp": ts, **{name: values[i] for name, values in metrics.items() if values[i] is not None}}
+            for i, ts in enumerate(timestamps)]
+
+
+def _as_float32(records):
+    return [{key: float(np.float32(value)) if isinstance(value, float) else value for key, value in record.items()}
+            for record in records]
+
+
+def _page(client, fmt):
+    response = client.get(f"/bess/{DEVICE_ID}", params={"date": "2024-01-02", "batch_size": 300, "format": fmt})
+    assert response.status_code == 200
+    return response
+
+
+def test_columnar_json_round_trips_to_rows(client):
+    rows = _page(client, "json").json()
+    columnar = _page(client, "columnar").json()
+
+    assert columnar.pop("timestamps") is not None
+    assert _rows_from_columns([row["timestamp"] for row in rows["data"]], columnar.pop("metrics")) == rows["data"]
+    assert columnar == {key: value for key, value in rows.items() if key != "data"}
+
+
+def test_arrow_round_trips_to_rows(client):
+    import pyarrow as pa
+    rows = _page(client, "json").json()["data"]
+    table = pa.ipc.open_stream(_page(client, "arrow").content).read_all()
+
+    columns = table.to_pydict()
+    timestamps = [pd.Timestamp(ts).isoformat() for ts in columns.pop("timestamp")]
+    assert _as_float32(_rows_from_columns(timestamps, columns)) == _as_float32(rows)
+
+
+def test_msgpack_round_trips_to_rows(client):
+    import msgpack
+    rows = _page(client, "json").json()["data"]
+    payload = msgpack.unpackb(_page(client, "msgpack").content)
+
+    n = payload["length"]
+    timestamps = np.frombuffer(payload["timestamps"], dtype='<i8').astype('datetime64[ms]')
+    metrics = {}
+    for name, column in payload["metrics"].items():
+        valid = np.unpackbits(np.frombuffer(column["valid"], dtype=np.uint8), count=n, bitorder='little').astype(bool)
+        if column["type"] == "bool":
+            values = np.frombuffer(column["values"], dtype=np.uint8).astype(bool).tolist()
+        else:
+            values = np.frombuffer(column["values"], dtype='<f4').astype(np.float64).tolist()
+        metrics[name] = [value if ok else None for value, ok in zip(values, valid.tolist())]
+
+    assert n == len(rows)
+    assert _rows_from_columns([pd.Timestamp(ts).isoformat() for ts in timestamps], metrics) == _as_float32(rows)
+
+
+def test_columnar_json_without_pyarrow(monkeypatch):
+    from core import serialization
+    frame = pd.DataFrame({
+        'timestamp': pd.date_range("2024-01-01", periods=3, freq="30s"),
+        'bms_soc': np.array([3.3, np.nan, 1e-7], dtype=np.float32),
+        'safety_smoke_flag': pd.array([True, None, False], dtype="boolean"),
+    })
+    with_arrow = json.loads(serialization.encode_columnar_json({"device_id": "x"}, frame, BESSReading))
+    monkeypatch.setattr(serialization, "pc", None)
+
+    assert json.loads(serialization.encode_columnar_json({"device_id": "x"}, frame, BESSReading)) == with_arrow
+    assert with_arrow["metrics"] == {"bms_soc": [3.3, None, 1e-7], "safety_smoke_flag": [True, None, False]}
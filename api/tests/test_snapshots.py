@@ -0,0 +1,40 @@
+import os
+import pandas as pd
+
+from conftest import DEVICE_ID, DATA_START
+from core.config import DATA_BASE_PATH, COLUMNAR_CACHE_PATH
+from core.data_manager import SimpleBESSDataManager
+from core.snapshots import SNAPSHOT_DIRNAME, read_snapshot, source_signatures
+
+SNAPSHOT_DIR = COLUMNAR_CACHE_PATH / DEVICE_ID / SNAPSHOT_DIRNAME
+
+
+def _snapshots(period: str) -> list:
+    return sorted(SNAPSHOT_DIR.glob(f"{period}-*.feather"))
+
+
+def test_only_canonical_periods_are_snapshotted():
+    start = DATA_START + pd.Timedelta(hours=5)
+    SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH, start_time=start,
+                          end_time=start + pd.Timedelta(hours=2)).create_unified_dataset()
+    SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH, "2024-01-03", target_points=50).create_unified_dataset()
+    assert not _snapshots(f"{start:%Y%m%d}*")
+    assert not _snapshots("2024-01-03")
+
+    SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH, "2024-01-03").create_unified_dataset()
+    assert len(_snapshots("2024-01-03")) == 1
+
+
+def test_stale_snapshots_are_replaced():
+    SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH, "2024-01-02").create_unified_dataset(max_records=500)
+    SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH, "2024-01-02").create_unified_dataset(max_records=400)
+    assert len(_snapshots("2024-01-02")) == 1
+
+    snapshot = _snapshots("2024-01-02")[0]
+    source = DATA_BASE_PATH / DEVICE_ID / "bms1_soh.csv"
+    os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 1_000_000_000))
+    metric_files = SimpleBESSDataManager(DEVICE_ID, DATA_BASE_PATH).get_metric_files()
+    sources = source_signatures(DATA_BASE_PATH / DEVICE_ID, metric_files.values())
+
+    assert read_snapshot(snapshot, sources) is None
+    assert not snapshot.exists()
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+
+from core.serialization import decode_cursor
+from routers import bess
+
+
+class RecordedManager:
+    """Stands in for a loaded manager: readings 30 s apart with a two-minute outage after the fourth"""
+    device_id = "REPLAYDEVICE0001"
+
+    def __init__(self):
+        offsets = np.array([0, 30, 60, 90, 210, 240], dtype='timedelta64[s]')
+        self.timestamps = np.datetime64('2024-01-01T00:00:00', 'ns') + offsets
+        self.rows = [json.dumps({"timestamp": str(ts), "position": i}) for i, ts in enumerate(self.timestamps)]
+
+    def position_after(self, timestamp):
+        return int(np.searchsorted(self.timestamps, np.datetime64(timestamp, 'ns'), side='right'))
+
+    def stream_rows(self, position, count):
+        end = min(position + count, len(self.rows))
+        following = self.timestamps[end] if end < len(self.rows) else None
+        return self.rows[position:end], self.timestamps[position:end], following
+
+
+def _replay(monkeypatch, **kwargs):
+    """Frames and sleeps of a whole replay, without waiting"""
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(bess.asyncio, "sleep", sleep)
+    streamer = bess.SimpleBESSStreamer("REPLAYDEVICE0001", RecordedManager(), **kwargs)
+
+    async def collect():
+        return [frame async for frame in streamer.stream_data()]
+
+    return asyncio.run(collect()), sleeps
+
+
+def _positions(frames):
+    payloads = [json.loads(frame.split("data: ", 1)[1]) for frame in frames if frame.startswith("id: ")]
+    return [[row["position"] for row in (payload if isinstance(payload, list) else [payload])] for payload in payloads]
+
+
+def test_replay_is_paced_by_recorded_timestamps(monkeypatch):
+    frames, sleeps = _replay(monkeypatch, batch_size=2, speed=10)
+
+    assert _positions(frames) == [[0, 1], [2, 3], [4, 5]]
+    assert frames[-1] == "event: end\ndata: {}\n\n"
+    # 60 s between batch starts at 10x; the outage is capped at the longest replay gap
+    assert sleeps == [6.0, min(120 / 10, bess.STREAM_REPLAY_MAX_GAP_SECONDS), 0.0]
+
+
+def test_long_waits_send_heartbeats(monkeypatch):
+    monkeypatch.setattr(bess, "STREAM_HEARTBEAT_SECONDS", 2.5)
+    frames, sleeps = _replay(monkeypatch, batch_size=4, speed=30)
+
+    # 210 s to the next batch at 30x is 7 s: two heartbeats, then the rest
+    assert frames.count(bess.HEARTBEAT_FRAME) == 2
+    assert sleeps == [2.5, 2.5, 2.0, 0.0]
+
+
+def test_event_ids_resume_after_the_last_reading(monkeypatch):
+    frames, _ = _replay(monkeypatch, batch_size=2, speed=1000)
+    last_event_id = frames[0].split("\n", 1)[0][len("id: "):]
+    assert pd.Timestamp(decode_cursor(last_event_id)) == pd.Timestamp("2024-01-01 00:00:30")
+
+    resumed, _ = _replay(monkeypatch, batch_size=2, speed=1000, after=decode_cursor(last_event_id))
+    assert _positions(resumed) == [[2, 3], [4, 5]]
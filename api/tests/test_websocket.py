@@ -0,0 +1,19 @@
+import pytest
+
+from conftest import DEVICE_ID
+
+
+@pytest.mark.parametrize("seq", ["x", None, [1], 1.5, -1, True])
+def test_malformed_ack_gets_an_error_frame(client, seq):
+    with client.websocket_connect("/bess/ws?interval=0.1&date=2024-01-02") as websocket:
+        websocket.send_json({"type": "ack", "seq": seq})
+        assert websocket.receive_json()["type"] == "error"
+
+        # The connection stays usable
+        websocket.send_json({"type": "subscribe", "devices": [DEVICE_ID], "metrics": ["bms_soc"]})
+        assert websocket.receive_json()["type"] == "subscribed"
+        frame = websocket.receive_json()
+        assert frame["type"] == "frame"
+
+        websocket.send_json({"type": "ack", "seq": frame["seq"]})
+        assert websocket.receive_json()["type"] == "frame"
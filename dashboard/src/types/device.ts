@@ -2,6 +2,9 @@ export interface Device {
   device_id: string;
   available_metrics: string[];
   total_rows_per_metric: Record<string, number>;
+  first_timestamp?: string | null;
+  last_timestamp?: string | null;
+  last_seen?: string | null;
 }
 
 export interface DeviceReading {